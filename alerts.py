@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PLACED = "placed"
+SUPPRESSED = "suppressed"
+FAILED = "failed"
+
+
+class DevCallCoalescer:
+    """Turns a stream of firing alerts into a bounded number of phone calls.
+
+    - Debounce: an alert fingerprint pages at most once per `window` seconds.
+    - Tiers: Asterisk is called first, Twilio only if the alert is still not
+      acked (resolved or reacted to) after `twilio_delay` seconds.
+    - Cap: at most `max_live_calls` pages are placed within `live_call_seconds`,
+      the ring timeout of a call.
+    """
+
+    def __init__(self, asterisk_call, twilio_call, window: float = 300.0, twilio_delay: float = 120.0,
+                 max_live_calls: int = 2, live_call_seconds: float = 60.0):
+        self.asterisk_call = asterisk_call
+        self.twilio_call = twilio_call
+        self.window = window
+        self.twilio_delay = twilio_delay
+        self.max_live_calls = max_live_calls
+        self.live_call_seconds = live_call_seconds
+        self.lock = threading.Lock()
+        self.last_paged = {}
+        self.pending = {}
+        self.message_fingerprints = {}
+        self.live_calls = deque()
+        self.counters = {
+            "asterisk_placed": 0,
+            "twilio_placed": 0,
+            "suppressed_debounce": 0,
+            "suppressed_cap": 0,
+            "acked": 0,
+            "failed": 0,
+        }
+
+    def _reserve_call(self, now: float) -> bool:
+        while self.live_calls and self.live_calls[0] <= now - self.live_call_seconds:
+            self.live_calls.popleft()
+        if len(self.live_calls) >= self.max_live_calls:
+            return False
+        self.live_calls.append(now)
+        return True
+
+    def page(self, fingerprint: str, ts: str = None) -> str:
+        """Pages for a firing alert unless it is debounced or over the call cap.
+
+        Returns PLACED, SUPPRESSED, or FAILED when no provider took the call;
+        a failed page is not debounced, so it can be retried right away.
+        """
+        now = time.monotonic()
+        with self.lock:
+            last = self.last_paged.get(fingerprint)
+            if last is not None and now - last < self.window:
+                self.counters["suppressed_debounce"] += 1
+                logger.info(f"Dev call for {fingerprint} suppressed, paged {now - last:.0f}s ago")
+                return SUPPRESSED
+            if not self._reserve_call(now):
+                self.counters["suppressed_cap"] += 1
+                logger.info(f"Dev call for {fingerprint} suppressed, {self.max_live_calls} calls already live")
+                return SUPPRESSED
+            self.last_paged[fingerprint] = now
+            self.counters["asterisk_placed"] += 1
+            self._expire(now)
+            timer = threading.Timer(self.twilio_delay, self._escalate, args=(fingerprint,))
+            timer.daemon = True
+            previous = self.pending.pop(fingerprint, None)
+            if previous:
+                previous.cancel()
+            self.pending[fingerprint] = timer
+            if ts:
+                self.message_fingerprints[ts] = fingerprint
+
+        logger.info(f"Dev call for {fingerprint}: calling Asterisk, Twilio in {self.twilio_delay}s if not acked")
+        if not self.asterisk_call():
+            with self.lock:
+                if self.pending.get(fingerprint) is timer:
+                    del self.pending[fingerprint]
+                if self.last_paged.get(fingerprint) == now:
+                    del self.last_paged[fingerprint]
+                if now in self.live_calls:
+                    self.live_calls.remove(now)
+                self.counters["asterisk_placed"] -= 1
+                self.counters["failed"] += 1
+            logger.error(f"Dev call for {fingerprint} failed, no voice provider took the call")
+            return FAILED
+        timer.start()
+        return PLACED
+
+    def _escalate(self, fingerprint: str):
+        with self.lock:
+            if self.pending.pop(fingerprint, None) is None:
+                return
+            if not self._reserve_call(time.monotonic()):
+                self.counters["suppressed_cap"] += 1
+                logger.info(f"Twilio escalation for {fingerprint} suppressed, {self.max_live_calls} calls already live")
+                return
+            self.counters["twilio_placed"] += 1
+        logger.info(f"Dev call for {fingerprint} not acked in {self.twilio_delay}s, calling Twilio")
+        self.twilio_call()
+
+    def ack(self, fingerprint: str = None, ts: str = None) -> bool:
+        """Stops escalation for an alert, by fingerprint or by the ts of its message."""
+        with self.lock:
+            if fingerprint is None:
+                fingerprint = self.message_fingerprints.get(ts)
+            timer = self.pending.pop(fingerprint, None)
+            if timer is None:
+                return False
+            timer.cancel()
+            self.counters["acked"] += 1
+        logger.info(f"Dev call for {fingerprint} acked, escalation cancelled")
+        return True
+
+    def _expire(self, now: float):
+        for fingerprint in [f for f, paged in self.last_paged.items() if now - paged >= self.window]:
+            del self.last_paged[fingerprint]
+        if len(self.message_fingerprints) > 1000:
+            active = set(self.last_paged)
+            self.message_fingerprints = {ts: f for ts, f in self.message_fingerprints.items() if f in active}
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters, pending=len(self.pending))
+
+    def close(self):
+        with self.lock:
+            for timer in self.pending.values():
+                timer.cancel()
+            self.pending = {}
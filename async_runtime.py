@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from slack_sdk.socket_mode.aiohttp import SocketModeClient as AsyncSocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.web.async_client import AsyncWebClient
+
+from backoff import jittered_backoff
+from metrics import ACK_LATENCY, STAGE_LATENCY, SOCKET_CONNECTED, SOCKET_RECONNECTS, SOCKET_RECOVERY
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSocketRuntime:
+    """Runs SlackBot on the SDK's aiohttp Socket Mode client.
+
+    Several WebSocket connections are kept open at once. Slack spreads
+    envelopes over all of them, so while one connection is reconnecting
+    the others keep receiving events. Reconnects are driven by our own
+    supervisor with jittered exponential backoff instead of the SDK's
+    fixed interval.
+    """
+
+    def __init__(self, bot, connections: int = 2, base_delay: float = 1.0, max_delay: float = 60.0,
+                 check_interval: float = 1.0, connect_timeout: float = 30.0):
+        self.bot = bot
+        self.connections = max(1, connections)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.check_interval = check_interval
+        self.connect_timeout = connect_timeout
+        self.clients = []
+        self.classifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classify")
+        self.stop_event = None
+        self.loop = None
+
+    async def handle_request(self, client: AsyncSocketModeClient, req: SocketModeRequest):
+        received = time.perf_counter()
+        await client.send_socket_mode_response({"envelope_id": req.envelope_id})
+        ACK_LATENCY.observe(time.perf_counter() - received, type=req.type, workspace=self.bot.workspace)
+        if req.type == "events_api":
+            # Classification writes dedup and outbox rows and can block on a full dispatcher,
+            # so it runs off the event loop to keep every connection reading and acking. One
+            # thread keeps events in arrival order.
+            await asyncio.get_running_loop().run_in_executor(self.classifier, self.classify, req)
+        elif req.type == "slash_commands":
+            await asyncio.get_running_loop().run_in_executor(None, self.bot.run_slash_command, req)
+
+    def classify(self, req: SocketModeRequest):
+        with STAGE_LATENCY.time(stage="classify", workspace=self.bot.workspace):
+            self.bot.classify_event(req)
+
+    def _build_client(self) -> AsyncSocketModeClient:
+        client = AsyncSocketModeClient(
+            app_token=self.bot.config.app_token,
+            web_client=AsyncWebClient(token=self.bot.config.bot_token, base_url=self.bot.config.slack_api_url),
+            auto_reconnect_enabled=False
+        )
+        client.socket_mode_request_listeners.append(self.handle_request)
+        return client
+
+    async def _connect(self, index: int, client: AsyncSocketModeClient):
+        attempt = 0
+        while not self.stop_event.is_set():
+            try:
+                await asyncio.wait_for(client.connect_to_new_endpoint(force=True), self.connect_timeout)
+                return
+            except Exception as e:
+                delay = jittered_backoff(attempt, self.base_delay, self.max_delay)
+                attempt += 1
+                logger.error(f"Socket connection {index} failed to connect ({e}), retrying in {delay:.1f}s")
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _supervise(self, index: int, client: AsyncSocketModeClient):
+        while not self.stop_event.is_set():
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), self.check_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            if await client.is_connected():
+                continue
+            disconnected_at = time.monotonic()
+            self.bot.catchup.disconnected()
+            self._update_connected_gauge()
+            logger.info(f"Socket connection {index} lost, reconnecting")
+            await self._connect(index, client)
+            recovered = time.monotonic() - disconnected_at
+            SOCKET_RECONNECTS.inc(workspace=self.bot.workspace)
+            SOCKET_RECOVERY.observe(recovered, workspace=self.bot.workspace)
+            self._update_connected_gauge()
+            logger.info(f"Socket connection {index} recovered in {recovered:.2f}s")
+            self.bot.catchup.request()
+
+    def _update_connected_gauge(self):
+        connected = sum(1 for c in self.clients if c.current_session is not None and not c.current_session.closed)
+        SOCKET_CONNECTED.set(connected, workspace=self.bot.workspace)
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        self.clients = [self._build_client() for _ in range(self.connections)]
+        await asyncio.gather(*(self._connect(i, c) for i, c in enumerate(self.clients)))
+        self._update_connected_gauge()
+        logger.info(f"Async Socket Mode runtime connected with {self.connections} connections")
+        try:
+            await asyncio.gather(*(self._supervise(i, c) for i, c in enumerate(self.clients)))
+        finally:
+            for client in self.clients:
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.error(f"Error closing socket connection: {e}")
+            SOCKET_CONNECTED.set(0, workspace=self.bot.workspace)
+            self.classifier.shutdown(wait=False)
+
+    def stop(self):
+        if self.loop is not None and self.stop_event is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
@@ -0,0 +1,6 @@
+import random
+
+
+def jittered_backoff(attempt: int, base: float = 1.0, maximum: float = 60.0) -> float:
+    """Full-jitter exponential backoff: a random delay in [0, min(maximum, base * 2 ** attempt)]."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
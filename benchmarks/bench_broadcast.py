@@ -0,0 +1,55 @@
+"""Compares the old one-by-one close-reception loop with Broadcaster.
+
+Runs against a local fake Slack Web API that rate limits every N-th call.
+Run from the repository root: python -m benchmarks.bench_broadcast
+"""
+import argparse
+import time
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app
+from broadcaster import Broadcaster
+
+
+def sequential(client: WebClient, messages: dict) -> int:
+    delivered = 0
+    for channel, text in messages.items():
+        try:
+            client.chat_postMessage(channel=channel, text=text)
+            delivered += 1
+        except SlackApiError:
+            pass
+    return delivered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--ratelimit-every", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    messages = {f"C{i:06d}": "We have technical issues, please close the reception." for i in range(args.channels)}
+    server = FakeServer(fake_slack_app(args.latency, args.ratelimit_every)).start()
+    client = WebClient(token="xoxb-fake", base_url=f"{server.url}/api/")
+    try:
+        started = time.monotonic()
+        delivered = sequential(client, messages)
+        print(f"sequential: {delivered}/{len(messages)} delivered in {time.monotonic() - started:.2f}s")
+
+        broadcaster = Broadcaster(client, workers=args.workers, post_rate=args.rate)
+        started = time.monotonic()
+        results = broadcaster.broadcast(messages, dry_run=args.dry_run)
+        print(f"broadcaster: {time.monotonic() - started:.2f}s")
+        print(Broadcaster.format_report(results, args.dry_run))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
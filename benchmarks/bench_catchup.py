@@ -0,0 +1,111 @@
+"""Messages sent to a watched channel while Socket Mode is down, with and
+without the reconnect catch-up.
+
+The async runtime runs with one WebSocket against a local fake Slack
+server. One live VIP message sets the channel's high-water mark, then the
+socket is dropped and --missed tagged messages land in the VIP channel's
+history while no connection is open. After the reconnect, half of them are
+also delivered live (as Slack does for events it retries), so the catch-up
+and the live path have to be merged by dedup. Reports how many of the
+missed messages were forwarded, duplicates, and how long the catch-up took.
+Run from the repository root: python -m benchmarks.bench_catchup
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app, fake_voip_app, push_envelope, drop_socket
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password", "METRICS_PORT": "0",
+    "VIP_CHANNELS": "CVIP", "TARGET_SIP1": "SIP/dev1", "FORWARD_BATCH_WINDOW": "0", "DEDUP_DB_PATH": "",
+    "IDENTITY_CACHE_PATH": "", "METADATA_WARM": "false", "VOIP_PROBE_INTERVAL": "0",
+}
+
+
+def message(i: int) -> dict:
+    return {"type": "message", "channel": "CVIP", "user": "U1", "ts": f"{time.time():.6f}", "text": f"TAG help {i}"}
+
+
+def envelope(event: dict) -> dict:
+    return {"envelope_id": f"env-{event['ts']}", "type": "events_api", "accepts_response_payload": False,
+            "payload": {"event_id": f"Ev{event['ts']}", "event": event}}
+
+
+def wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def forwards(app) -> list:
+    return [data.get("text", "") for method, data in app["calls"] if method == "chat.postMessage"]
+
+
+def scenario(label: str, missed: int, catchup_window: str, directory: str):
+    app = fake_slack_app(latency=0.005)
+    slack = FakeServer(app).start()
+    voip = FakeServer(fake_voip_app(latency=0.005)).start()
+    os.environ.update(ENV, SLACK_API_URL=f"{slack.url}/api/", ARI_URL=f"{voip.url}/ari",
+                      CATCHUP_WINDOW=catchup_window, OUTBOX_PATH=os.path.join(directory, f"outbox-{label}.sqlite3"))
+
+    from slack_bot import SlackBot
+    from async_runtime import AsyncSocketRuntime
+
+    bot = SlackBot()
+    bot.dispatcher.start()
+    runtime = AsyncSocketRuntime(bot, connections=1, base_delay=0.5, check_interval=0.1)
+    bot.async_runtime = runtime
+    thread = threading.Thread(target=asyncio.run, args=(runtime.run(),), daemon=True)
+    thread.start()
+    try:
+        if not wait_for(lambda: len(app["sockets"]) == 1, 10):
+            raise SystemExit("runtime did not connect")
+        time.sleep(0.01)
+        server_call = slack.call
+        server_call(push_envelope(app, envelope(message(-1))))
+        wait_for(lambda: len(forwards(app)) == 1, 5)
+
+        server_call(drop_socket(app, 0))
+        outage = [message(i) for i in range(missed)]
+        app["history"]["CVIP"] = outage
+        delivered_live = sum(server_call(push_envelope(app, envelope(event))) for event in outage)
+        reconnected_at = time.monotonic()
+        wait_for(lambda: any(not ws.closed for ws in app["sockets"]), 30)
+        for event in outage[::2]:
+            server_call(push_envelope(app, envelope(event)))
+        expected = missed if catchup_window != "0" else len(outage[::2])
+        wait_for(lambda: len(forwards(app)) >= expected + 1, 30)
+        bot.dispatcher.shutdown()
+        elapsed = time.monotonic() - reconnected_at
+        texts = forwards(app)[1:]
+        recovered = len({text for text in texts})
+        stats = bot.catchup.stats()
+    finally:
+        bot.stop()
+        thread.join(10)
+        slack.stop()
+        voip.stop()
+    print(f"{label:<12} {missed} messages missed during the outage ({delivered_live} delivered live), "
+          f"{recovered} forwarded after reconnect, {len(texts) - recovered} duplicates, "
+          f"done {elapsed:.2f}s after reconnect, catch-up {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--missed", type=int, default=40)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        scenario("no catch-up", args.missed, "0", directory)
+        scenario("catch-up", args.missed, "900", directory)
+
+
+if __name__ == "__main__":
+    main()
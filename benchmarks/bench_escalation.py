@@ -0,0 +1,54 @@
+"""Compares sequential requests.post dialing with the concurrent EscalationEngine.
+
+Run from the repository root: python -m benchmarks.bench_escalation
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from benchmarks.fake_servers import FakeServer, fake_voip_app
+from escalation import EscalationEngine
+
+
+def sequential_page(url: str, targets: list) -> float:
+    started = time.monotonic()
+    for target in targets:
+        requests.post(f"{url}/ari/channels", params={"endpoint": target, "app": "quick-call"},
+                      auth=("user", "password"), timeout=60)
+    return time.monotonic() - started
+
+
+def concurrent_page(engine: EscalationEngine, url: str, targets: list) -> float:
+    started = time.monotonic()
+    calls = [{"target": target, "url": f"{url}/ari/channels",
+              "params": {"endpoint": target, "app": "quick-call"}} for target in targets]
+    engine.dial("asterisk", ("user", "password"), calls, timeout=60)
+    return time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = FakeServer(fake_voip_app(args.latency)).start()
+    engine = EscalationEngine()
+    targets = [f"SIP/target{i}" for i in range(args.targets)]
+    try:
+        sequential = [sequential_page(server.url, targets) for _ in range(args.pages)]
+        concurrent = [concurrent_page(engine, server.url, targets) for _ in range(args.pages)]
+    finally:
+        engine.close()
+        server.stop()
+
+    print(f"{args.targets} targets, {args.pages} pages, {args.latency * 1000:.0f} ms server latency")
+    print(f"sequential: median {statistics.median(sequential) * 1000:.1f} ms")
+    print(f"concurrent: median {statistics.median(concurrent) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
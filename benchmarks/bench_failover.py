@@ -0,0 +1,93 @@
+"""Voice provider failover against fake ARI/Twilio servers with injected faults.
+
+Each phase places --pages pages and reports how long each took and which
+provider answered:
+
+  healthy         both providers up
+  asterisk 500    ARI answers every request with 500
+  asterisk hangs  ARI stops answering (longer than ASTERISK_CALL_TIMEOUT),
+                  once with plain AsteriskVOIP.quick_call() and once through
+                  the VoiceRouter with circuit breakers and health probes
+  recovered       the fault is cleared, probes close the circuit again
+
+Run from the repository root: python -m benchmarks.bench_failover
+"""
+import argparse
+import os
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.fake_servers import FakeServer, fake_voip_app
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password",
+    "TWILIO_SIP": "sip:dev1@example.com", "TWILIO_ACCOUNT_SID": "ACfake", "TWILIO_ACCOUNT_TOKEN": "fake",
+    "TARGET_SIP1": "SIP/dev1", "TARGET_SIP2": "SIP/dev2",
+    "ASTERISK_CALL_TIMEOUT": "3", "TWILIO_CALL_TIMEOUT": "3", "VOIP_PROBE_TIMEOUT": "0.5",
+}
+
+
+def run_phase(label: str, app, call, pages: int, interval: float):
+    calls_before = len(app["calls"])
+    durations = []
+    answered = 0
+    for _ in range(pages):
+        started = time.perf_counter()
+        answered += bool(call())
+        durations.append(time.perf_counter() - started)
+        time.sleep(interval)
+    providers = Counter(provider for provider, _ in app["calls"][calls_before:])
+    print(f"{label:<28} paged {answered}/{pages}, median {statistics.median(durations) * 1000:7.1f}ms, "
+          f"max {max(durations) * 1000:7.1f}ms, total {sum(durations):6.2f}s, calls by provider {dict(providers)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between pages")
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    app = fake_voip_app(latency=0.02)
+    server = FakeServer(app).start()
+    os.environ.update(ENV, ARI_URL=f"{server.url}/ari", TWILIO_API_URL=server.url)
+
+    from config import SlackBotConfig
+    from escalation import EscalationEngine
+    from failover import VoiceRouter
+    from voip import AsteriskVOIP
+    from voip_twilio import TwilioVOIP
+
+    config = SlackBotConfig()
+    engine = EscalationEngine()
+    asterisk = AsteriskVOIP(config, engine)
+    twilio = TwilioVOIP(config, engine)
+    router = VoiceRouter([asterisk, twilio], failure_threshold=2, reset_timeout=60,
+                         probe_interval=args.probe_interval)
+    router.start()
+    page = lambda: router.call(AsteriskVOIP.name)
+    try:
+        run_phase("healthy, router", app, page, args.pages, args.interval)
+
+        app["faults"]["asterisk"] = {"status": 500}
+        run_phase("asterisk 500, router", app, page, args.pages, args.interval)
+
+        app["faults"]["asterisk"] = {"delay": 10}
+        run_phase("asterisk hangs, no router", app, asterisk.quick_call, 2, args.interval)
+        router.breakers[AsteriskVOIP.name].record_success()
+        run_phase("asterisk hangs, router", app, page, args.pages, args.interval)
+
+        app["faults"].clear()
+        time.sleep(args.probe_interval * 3)
+        run_phase("recovered, router", app, page, args.pages, args.interval)
+        print(f"router: {router.stats()}, health probes sent: {dict(Counter(app['probes']))}")
+    finally:
+        router.close()
+        engine.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
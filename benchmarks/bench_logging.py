@@ -0,0 +1,87 @@
+"""Per-event logging overhead: eager f-strings with synchronous handlers vs
+lazy formatting behind a QueueHandler/QueueListener.
+
+Both variants run at INFO level with a file handler and a stream handler
+pointed at os.devnull. Run from the repository root: python -m benchmarks.bench_logging
+"""
+import argparse
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+EVENT = {
+    "type": "message", "channel": "C0123456789", "user": "U0123456789", "ts": "1700000000.000100",
+    "text": "please help TAG the odds feed is stuck " * 5,
+    "blocks": [{"type": "rich_text", "elements": [{"type": "text", "text": "x" * 200}]}] * 3,
+}
+
+
+def make_handlers(directory: str) -> list:
+    file_handler = RotatingFileHandler(os.path.join(directory, "bench.log"), maxBytes=10 * 1024 * 1024,
+                                       backupCount=1, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+    console_handler = logging.StreamHandler(open(os.devnull, "w"))
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    return [file_handler, console_handler]
+
+
+def eager_event(logger: logging.Logger, event: dict):
+    logger.info(f"Request received: events_api, payload: {'DEBUG_MODE = FALSE'}")
+    logger.debug(f"Full event: {event}")
+    logger.info("Checking if this is dev_call")
+    logger.info(f"Not dev_call - {event.get('bot_id')} - {event['channel']}")
+    logger.debug(event)
+    logger.info(f"Message in channel {event['channel']} from user {event['user']}: {event['text']}")
+    logger.debug(f"Tag check in text '{event['text']}': found")
+
+
+def lazy_event(logger: logging.Logger, event: dict):
+    verbose = logger.isEnabledFor(logging.DEBUG)
+    logger.info("Request received: %s, event_id: %s", "events_api", "Ev0123")
+    if verbose:
+        logger.debug("Full event: %s", event)
+    logger.debug("Not dev_call - %s - %s", event.get('bot_id'), event['channel'])
+    logger.info("Message in channel %s from user %s: %s", event['channel'], event['user'], event['text'])
+    logger.debug("Tag check in text '%s': %s", event['text'], 'found')
+
+
+def measure(label: str, logger: logging.Logger, func, events: int):
+    started = time.perf_counter()
+    for _ in range(events):
+        func(logger, EVENT)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {elapsed / events * 1e6:.1f} us/event on the calling thread")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync_logger = logging.getLogger("bench.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        for handler in make_handlers(directory):
+            sync_logger.addHandler(handler)
+        measure("eager + synchronous handlers", sync_logger, eager_event, args.events)
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *make_handlers(directory), respect_handler_level=True)
+        listener.start()
+        queued_logger = logging.getLogger("bench.queued")
+        queued_logger.propagate = False
+        queued_logger.setLevel(logging.INFO)
+        queued_logger.addHandler(QueueHandler(log_queue))
+        measure("lazy + QueueHandler", queued_logger, lazy_event, args.events)
+        listener.stop()
+
+        for handler in sync_logger.handlers:
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
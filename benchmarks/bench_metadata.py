@@ -0,0 +1,83 @@
+"""Web API calls needed to enrich forwards with channel and user names:
+users_info + conversations_info per forward vs the warmed MetadataCache.
+
+The fake Slack workspace has --channels channels and --users users. Forwards
+come from random channels and users, a few of them created after the cache
+was warmed (misses), and one channel is renamed through a channel_rename
+event halfway through.
+Run from the repository root: python -m benchmarks.bench_metadata
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--forwards", type=int, default=2000)
+    parser.add_argument("--new", type=float, default=0.01, help="share of forwards from users unknown at warm-up")
+    args = parser.parse_args()
+
+    app = fake_slack_app(latency=0.005)
+    app["channels"] = {f"C{i:06d}": f"channel-{i}" for i in range(args.channels)}
+    app["users"] = {f"U{i:06d}": f"user-{i}" for i in range(args.users)}
+    server = FakeServer(app).start()
+
+    from broadcaster import Broadcaster
+    from metadata import MetadataCache
+    from slack_client import InstrumentedWebClient
+
+    client = InstrumentedWebClient(token="xoxb-fake", base_url=f"{server.url}/api/")
+    broadcaster = Broadcaster(client)
+    # The fake has no rate limits, only count calls here
+    broadcaster.buckets = {}
+    rng = random.Random(1)
+    forwards = [
+        (f"C{rng.randrange(args.channels):06d}",
+         f"U{rng.randrange(args.users, args.users * 2) if rng.random() < args.new else rng.randrange(args.users):06d}")
+        for _ in range(args.forwards)
+    ]
+
+    cache = MetadataCache(broadcaster.call)
+    try:
+        calls_before = len(app["calls"])
+        started = time.perf_counter()
+        for channel, user in forwards:
+            client.conversations_info(channel=channel)
+            client.users_info(user=user)
+        per_message = time.perf_counter() - started
+        print(f"info calls per forward: {len(app['calls']) - calls_before} Web API calls, "
+              f"{per_message / args.forwards * 1000:.2f}ms per forward")
+
+        calls_before = len(app["calls"])
+        started = time.perf_counter()
+        cache.warm()
+        warm_time = time.perf_counter() - started
+        warm_calls = len(app["calls"]) - calls_before
+        renamed = forwards[0][0]
+        calls_before = len(app["calls"])
+        started = time.perf_counter()
+        for i, (channel, user) in enumerate(forwards):
+            if i == len(forwards) // 2:
+                cache.on_event({"type": "channel_rename", "channel": {"id": renamed, "name": "renamed-channel"}})
+            cache.channel_name(channel)
+            cache.user_name(user)
+        cached = time.perf_counter() - started
+        cache.wait_fetched()
+        methods = Counter(method for method, _ in app["calls"][calls_before:])
+        print(f"metadata cache: warm-up {warm_calls} calls in {warm_time:.2f}s, then "
+              f"{len(app['calls']) - calls_before} calls {dict(methods)}, "
+              f"{cached / args.forwards * 1000:.3f}ms per forward")
+        print(f"cache stats: {cache.stats()}, {renamed} is now #{cache.channel_name(renamed)}")
+    finally:
+        cache.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Outbox throughput for each sqlite synchronous mode and commit batch size.
+
+Every action is appended (and waits for its commit) and then completed, the
+same two writes the bot does per forward or page. Several threads write at
+once, like the dispatcher workers. Run from the repository root:
+python -m benchmarks.bench_outbox
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from outbox import Outbox
+
+PAYLOAD = {
+    "event": {"type": "message", "channel": "C0123456789", "user": "U0123456789", "ts": "1700000000.000100",
+              "text": "please help TAG the odds feed is stuck"},
+    "actions": [["support_tag", "forward"]],
+}
+
+
+def run(directory: str, sync: str, batch_size: int, interval: float, threads: int, actions: int) -> float:
+    outbox = Outbox(os.path.join(directory, f"outbox-{sync}-{batch_size}.sqlite3"), sync=sync,
+                    batch_size=batch_size, batch_interval=interval)
+    per_thread = actions // threads
+
+    def worker(index: int):
+        for i in range(per_thread):
+            entry = outbox.append(f"message:C{index}:{i}", "message", PAYLOAD)
+            outbox.complete(entry)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    outbox.close()
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--actions", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.001, help="batch_interval in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        for sync in ("off", "normal", "full"):
+            for batch_size in (1, 16, 64):
+                rate = run(directory, sync, batch_size, args.interval, args.threads, args.actions)
+                print(f"synchronous={sync:<6} batch_size={batch_size:<3} {rate:8.0f} actions/s")
+
+
+if __name__ == "__main__":
+    main()
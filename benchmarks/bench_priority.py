@@ -0,0 +1,63 @@
+"""Queue wait of paging vs routine actions while routine traffic floods the dispatcher.
+
+--routine slow forwards (each takes --work seconds) arrive at once across
+20 channels, and --paging dev calls/VIP calls arrive spread over the burst.
+"fifo" submits everything as routine, i.e. arrival order as before priority
+classes existed. "weighted" submits pages as paging with the default 4:1
+weights. Reports p50/p99/max queue wait per class and paging SLO misses.
+Run from the repository root: python -m benchmarks.bench_priority
+"""
+import argparse
+import threading
+import time
+
+from dispatcher import EventDispatcher, PAGING, ROUTINE
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(mode: str, routine: int, paging: int, work: float, workers: int, slo: float):
+    dispatcher = EventDispatcher(workers=workers, max_queue_size=(routine + paging) * 2, paging_slo=slo)
+    waits = {PAGING: [], ROUTINE: []}
+    lock = threading.Lock()
+
+    def handler(kind: str, submitted: float):
+        with lock:
+            waits[kind].append(time.monotonic() - submitted)
+        time.sleep(work)
+
+    dispatcher.start()
+    pages_every = max(1, routine // paging)
+    sent_pages = 0
+    for i in range(routine):
+        dispatcher.submit(f"C{i % 20}", handler, ROUTINE, time.monotonic())
+        if i % pages_every == 0 and sent_pages < paging:
+            priority = PAGING if mode == "weighted" else ROUTINE
+            dispatcher.submit(f"CVIP{sent_pages % 4}", handler, PAGING, time.monotonic(), priority=priority)
+            sent_pages += 1
+            time.sleep(work / 2)
+    dispatcher.shutdown()
+    paging_waits = waits[PAGING]
+    missed = sum(1 for wait in paging_waits if wait > slo)
+    print(f"{mode:<9} paging wait p50={percentile(paging_waits, 0.5):.2f}s p99={percentile(paging_waits, 0.99):.2f}s "
+          f"max={max(paging_waits):.2f}s, SLO {slo}s missed {missed}/{len(paging_waits)}; "
+          f"routine wait p50={percentile(waits[ROUTINE], 0.5):.2f}s max={max(waits[ROUTINE]):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routine", type=int, default=400)
+    parser.add_argument("--paging", type=int, default=20)
+    parser.add_argument("--work", type=float, default=0.05, help="seconds each action takes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--slo", type=float, default=1.0)
+    args = parser.parse_args()
+    for mode in ("fifo", "weighted"):
+        run(mode, args.routine, args.paging, args.work, args.workers, args.slo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Forces a Socket Mode disconnect and measures time-to-recover.
+
+Runs the async runtime with --connections WebSockets against a local fake
+Slack server, closes one socket from the server side and keeps pushing
+events during the outage. Reports recovery time and how many events were
+acked while the connection was down.
+Run from the repository root: python -m benchmarks.bench_reconnect
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app, push_envelope, drop_socket
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password", "METRICS_PORT": "0",
+}
+
+
+def envelope(i: int) -> dict:
+    return {
+        "envelope_id": f"env-{i}", "type": "events_api", "accepts_response_payload": False,
+        "payload": {"event_id": f"Ev{i}", "event": {"type": "message", "channel": "CGENERAL", "user": "U1",
+                                                     "ts": f"{time.time():.6f}", "text": "hello"}},
+    }
+
+
+def wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=2)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    app = fake_slack_app(latency=0)
+    server = FakeServer(app).start()
+    os.environ.update(ENV, SLACK_API_URL=f"{server.url}/api/", RECONNECT_BASE_DELAY="0.5")
+
+    from slack_bot import SlackBot
+    from async_runtime import AsyncSocketRuntime
+    from metrics import SOCKET_RECOVERY
+
+    bot = SlackBot()
+    bot.dispatcher.start()
+    runtime = AsyncSocketRuntime(bot, connections=args.connections, base_delay=0.5, check_interval=0.1)
+    bot.async_runtime = runtime
+    thread = threading.Thread(target=asyncio.run, args=(runtime.run(),), daemon=True)
+    thread.start()
+    try:
+        if not wait_for(lambda: len(app["sockets"]) == args.connections, 10):
+            raise SystemExit("runtime did not connect")
+        dropped_at = time.monotonic()
+        server.call(drop_socket(app, 0))
+        sent = 0
+        for i in range(args.events):
+            sent += server.call(push_envelope(app, envelope(i)))
+        acked_during_outage = len(app["acks"])
+        recovered = wait_for(lambda: len([ws for ws in app["sockets"] if not ws.closed]) == args.connections, 30)
+        recovery = time.monotonic() - dropped_at
+        wait_for(lambda: len(app["acks"]) >= sent, 5)
+    finally:
+        bot.stop()
+        thread.join(10)
+        server.stop()
+
+    print(f"connections: {args.connections}")
+    print(f"recovered: {recovered}, time to recover: {recovery:.2f}s "
+          f"(runtime histogram count={SOCKET_RECOVERY.values.get(('default',), [None, 0, 0])[2]})")
+    print(f"events pushed during outage: {sent}/{args.events}, acked during outage: {acked_during_outage}, "
+          f"acked total: {len(app['acks'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Replays Socket Mode traffic through SlackBot and reports ack latency,
+throughput and the actions the bot took.
+
+Traffic files are JSON lines: {"at": <seconds from start>, "envelope": {...}}
+where the envelope is what Slack sends over the socket (envelope_id, type,
+payload). `synthesize` writes a scenario, `replay` plays a file back at its
+recorded pace (scaled by --speed) or at a fixed --rate. The Slack Web API,
+Asterisk ARI and Twilio are local fakes, so everything runs offline.
+
+Message ts values are shifted to the replay time, otherwise the bot would
+drop them as older than its start.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay synthesize --scenario mixed --events 2000 --rate 200 traffic.jsonl
+    python -m benchmarks.bench_replay replay traffic.jsonl --rate 500
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app, fake_voip_app
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password", "METRICS_PORT": "0",
+    "VIP_CHANNELS": "CVIP", "TWILIO_CHANNEL": "CALERTS", "TWILIO_BOT": "BALERTMANAGER",
+    "TWILIO_SIP": "sip:dev1@example.com", "TWILIO_ACCOUNT_SID": "ACfake", "TWILIO_ACCOUNT_TOKEN": "fake",
+    "TARGET_SIP1": "SIP/dev1", "TARGET_SIP2": "SIP/dev2", "DEDUP_DB_PATH": "",
+    "DEV_CALL_TWILIO_DELAY": "3600",
+}
+
+BASE_TS = 1700000000.0
+
+
+def message_envelope(i: int, ts: float, event: dict) -> dict:
+    event = dict(event, type="message", ts=f"{ts:.6f}")
+    return {"envelope_id": f"env-{i}", "type": "events_api", "accepts_response_payload": False,
+            "payload": {"event_id": f"Ev{i}", "event": event}}
+
+
+def alert_event(fingerprint: str, status: str) -> dict:
+    return {"channel": "CALERTS", "bot_id": "BALERTMANAGER", "subtype": "bot_message", "text": "",
+            "attachments": [{"fallback": f"[{status}:1] {fingerprint}", "title": f"[{status}:1] {fingerprint}",
+                             "text": "call_voip = true"}]}
+
+
+def synthesize(scenario: str, events: int, rate: float, seed: int = 1) -> list:
+    """Returns traffic records for one of the scenarios:
+
+    flood       an incident channel with a few busy threads full of tagged replies
+    alertstorm  Alertmanager firing and resolving a small set of flapping alerts
+    mixed       both, plus VIP messages, chatter and slash commands
+    """
+    rng = random.Random(seed)
+    records = []
+    threads = []
+    for i in range(events):
+        at = i / rate
+        ts = BASE_TS + at + i / 1e6
+        kind = scenario if scenario != "mixed" else rng.choices(
+            ["flood", "alertstorm", "vip", "chatter", "command"], [40, 20, 5, 30, 5])[0]
+        if kind == "flood":
+            if not threads or rng.random() < 0.05:
+                threads.append(ts)
+                event = {"channel": "CINCIDENT", "user": f"U{i % 50}", "text": f"TAG feed is down ({i})"}
+            else:
+                event = {"channel": "CINCIDENT", "user": f"U{i % 50}", "text": f"TAG still broken ({i})",
+                         "thread_ts": f"{rng.choice(threads[-3:]):.6f}"}
+            envelope = message_envelope(i, ts, event)
+        elif kind == "alertstorm":
+            status = "FIRING" if rng.random() < 0.8 else "RESOLVED"
+            envelope = message_envelope(i, ts, alert_event(f"HighErrorRate service-{rng.randint(1, 5)}", status))
+        elif kind == "vip":
+            envelope = message_envelope(i, ts, {"channel": "CVIP", "user": "UVIP", "text": f"urgent question {i}"})
+        elif kind == "chatter":
+            envelope = message_envelope(i, ts, {"channel": "CGENERAL", "user": f"U{i % 50}", "text": f"lunch? {i}"})
+        else:
+            envelope = {"envelope_id": f"env-{i}", "type": "slash_commands", "accepts_response_payload": True,
+                        "payload": {"command": "/rocket", "channel_id": "CGENERAL", "user_id": f"U{i % 50}",
+                                    "user_name": f"user{i % 50}", "text": ""}}
+        records.append({"at": at, "envelope": envelope})
+    return records
+
+
+def write_traffic(path: str, records: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_traffic(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def shift_timestamps(records: list, now: float) -> list:
+    """Moves every message ts (and thread_ts) so the earliest one is `now`."""
+    stamps = [float(r["envelope"]["payload"]["event"]["ts"]) for r in records
+              if r["envelope"]["type"] == "events_api" and "ts" in r["envelope"]["payload"].get("event", {})]
+    if not stamps:
+        return records
+    delta = round((now - min(stamps)) * 1e6)
+    shifted = []
+    for record in records:
+        record = json.loads(json.dumps(record))
+        event = record["envelope"]["payload"].get("event")
+        if record["envelope"]["type"] == "events_api" and event:
+            for field in ("ts", "thread_ts"):
+                if field in event:
+                    event[field] = f"{(round(float(event[field]) * 1e6) + delta) / 1e6:.6f}"
+        shifted.append(record)
+    return shifted
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class AckRecorder:
+    """Stands in for the SocketModeClient, timing every ack."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scheduled = {}
+        self.latencies = []
+
+    def send_socket_mode_response(self, response: dict):
+        acked = time.perf_counter()
+        with self.lock:
+            scheduled = self.scheduled.pop(response["envelope_id"], None)
+            if scheduled is not None:
+                self.latencies.append(acked - scheduled)
+
+
+def replay(path: str, rate: float, speed: float, concurrency: int, slack_latency: float, voip_latency: float):
+    records = read_traffic(path)
+    slack = fake_slack_app(latency=slack_latency)
+    voip = fake_voip_app(latency=voip_latency)
+    slack_server = FakeServer(slack).start()
+    voip_server = FakeServer(voip).start()
+    workdir = tempfile.TemporaryDirectory()
+    os.environ.update(ENV, SLACK_API_URL=f"{slack_server.url}/api/", ARI_URL=f"{voip_server.url}/ari",
+                      TWILIO_API_URL=voip_server.url, OUTBOX_PATH=os.path.join(workdir.name, "outbox.sqlite3"))
+
+    from slack_sdk.socket_mode.request import SocketModeRequest
+    from slack_bot import SlackBot
+    from metrics import EVENTS_DISPATCHED, EVENTS_SKIPPED
+
+    bot = SlackBot()
+    bot.dispatcher.start()
+    records = shift_timestamps(records, time.time() + 1)
+    recorder = AckRecorder()
+
+    def deliver(envelope: dict):
+        request = SocketModeRequest.from_dict(envelope)
+        if request.type == "slash_commands":
+            bot.handle_slash_commands(recorder, request)
+        else:
+            bot.handle_message(recorder, request)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+        for i, record in enumerate(records):
+            offset = i / rate if rate else record["at"] / speed
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            envelope = record["envelope"]
+            with recorder.lock:
+                recorder.scheduled[envelope["envelope_id"]] = time.perf_counter()
+            executor.submit(deliver, envelope)
+        sent = time.perf_counter() - started
+    acked = time.perf_counter() - started
+    bot.dispatcher.shutdown()
+    finished = time.perf_counter() - started
+    dispatcher = bot.dispatcher.stats()
+    bot.stop()
+    slack_server.stop()
+    voip_server.stop()
+    workdir.cleanup()
+
+    latencies = recorder.latencies
+    print(f"envelopes: {len(records)} from {path}, sent in {sent:.2f}s, all acked after {acked:.2f}s, "
+          f"processed after {finished:.2f}s")
+    print(f"throughput: {len(records) / finished:.0f} envelopes/s end to end")
+    print(f"ack latency: p50={percentile(latencies, 0.5) * 1000:.2f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:.2f}ms max={max(latencies, default=0) * 1000:.2f}ms "
+          f"({len(latencies)} acks)")
+    print(f"dispatcher: processed={dispatcher['processed']} rejected={dispatcher['rejected']} "
+          f"failed={dispatcher['failed']} max_wait={dispatcher['max_wait'] * 1000:.1f}ms")
+    print("dispatched:", dict((key[0], int(value)) for key, value in EVENTS_DISPATCHED.values.items()))
+    print("skipped:", dict((key[0], int(value)) for key, value in EVENTS_SKIPPED.values.items()))
+    methods = Counter(method for method, _ in slack["calls"] if method != "auth.test")
+    print("slack calls:", dict(methods))
+    print("voip calls:", dict(Counter(provider for provider, _ in voip["calls"])))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    make = commands.add_parser("synthesize", help="write a synthetic traffic file")
+    make.add_argument("path")
+    make.add_argument("--scenario", choices=("flood", "alertstorm", "mixed"), default="mixed")
+    make.add_argument("--events", type=int, default=2000)
+    make.add_argument("--rate", type=float, default=200.0, help="envelopes per second in the recording")
+    make.add_argument("--seed", type=int, default=1)
+    play = commands.add_parser("replay", help="replay a traffic file through SlackBot")
+    play.add_argument("path")
+    play.add_argument("--rate", type=float, default=0.0, help="fixed envelopes per second, 0 keeps recorded pace")
+    play.add_argument("--speed", type=float, default=1.0, help="multiplier for the recorded pace")
+    play.add_argument("--concurrency", type=int, default=10, help="socket listener threads")
+    play.add_argument("--slack-latency", type=float, default=0.02)
+    play.add_argument("--voip-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        records = synthesize(args.scenario, args.events, args.rate, args.seed)
+        write_traffic(args.path, records)
+        print(f"wrote {len(records)} {args.scenario} envelopes to {args.path}")
+    else:
+        replay(args.path, args.rate, args.speed, args.concurrency, args.slack_latency, args.voip_latency)
+
+
+if __name__ == "__main__":
+    main()
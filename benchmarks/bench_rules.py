@@ -0,0 +1,61 @@
+"""Measures routing decisions per second: legacy MessageProcessor checks vs RuleEngine.
+
+Run from the repository root: python -m benchmarks.bench_rules
+"""
+import argparse
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from rules import RuleEngine
+
+BOT_USER_ID = "U0BOT"
+CHANNELS = ["C09BD8TMDED", "C02T9LSBB0W", "CVIP1", "CVIP2", "CGENERAL", "CRANDOM"]
+TEXTS = [
+    "hello team, anyone around?",
+    "please help @support_tag the feed is down",
+    f"<@{BOT_USER_ID}> can you check this market",
+    "Dead heat resulted market 12345",
+    "lorem ipsum dolor sit amet " * 20,
+]
+
+
+def legacy_route(config, channel: str, text: str) -> list:
+    # Mirrors the per-message work done before the rule engine existed
+    actions = []
+    if channel == "C09BD8TMDED" and "Dead heat resulted market" in text:
+        return actions
+    if re.compile(rf'{re.escape(config.tag)}', re.IGNORECASE).search(text):
+        actions.append("forward")
+    if re.search(f'{BOT_USER_ID}', text):
+        actions.append("forward")
+    if channel in config.vip_channels.split(','):
+        actions.append("call")
+    return actions
+
+
+def run(label: str, func, events: list):
+    started = time.perf_counter()
+    for channel, text in events:
+        func(channel, text)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {len(events) / elapsed:,.0f} events/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    config = SimpleNamespace(tag="@support_tag", vip_channels="CVIP1,CVIP2", routing_rules={})
+    engine = RuleEngine.from_config(config, BOT_USER_ID)
+    rng = random.Random(42)
+    events = [(rng.choice(CHANNELS), rng.choice(TEXTS)) for _ in range(args.events)]
+
+    run("legacy", lambda channel, text: legacy_route(config, channel, text), events)
+    run("rule engine", lambda channel, text: engine.evaluate(channel, "", text), events)
+
+
+if __name__ == "__main__":
+    main()
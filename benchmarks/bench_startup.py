@@ -0,0 +1,101 @@
+"""Measures time and peak RSS from interpreter start to a constructed SlackBot.
+
+Each run is a fresh subprocess talking to a local fake Slack Web API with
+--latency seconds per call. Runs are repeated without the identity cache
+(blocking auth_test) and with a warm one (auth_test revalidated in the
+background). --importtime runs the child once under `python -X importtime`
+and lists the slowest imports by cumulative time. Use --repo to point at
+another checkout and compare before/after numbers.
+Run from the repository root: python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app
+
+CHILD = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+import slack_bot
+constructed = time.perf_counter()
+bot = slack_bot.SlackBot()
+finished = time.perf_counter()
+print(json.dumps({
+    "import": constructed - started,
+    "construct": finished - constructed,
+    "total": finished - started,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+os._exit(0)
+"""
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password",
+    "NEW_API_CHAT_IDS": json.dumps({f"C{i:06d}": "RU" for i in range(300)}),
+    "OLD_API_CHAT_IDS": json.dumps({f"D{i:06d}": "ENG" for i in range(300)}),
+    "VIP_CHANNELS": "CVIP", "METRICS_PORT": "0", "METADATA_WARM": "false",
+}
+
+
+def run_child(env: dict, workdir: str, *flags) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", CHILD], cwd=workdir, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def report(label: str, results: list):
+    timings = ", ".join(f"{key} {statistics.median(r[key] for r in results) * 1000:.1f} ms"
+                        for key in ("import", "construct", "total"))
+    print(f"{label:<22} median {timings}, max RSS {statistics.median(r['max_rss_mb'] for r in results):.1f} MB")
+
+
+def import_profile(env: dict, workdir: str, top: int):
+    stderr = run_child(env, workdir, "-X", "importtime").stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative_us), int(self_us), name[1:]))
+    top_level = sum(cumulative for cumulative, _, name in imports if not name.startswith(" "))
+    print(f"-X importtime: {len(imports)} modules, {top_level / 1000:.1f} ms total")
+    for cumulative, self_us, name in sorted(imports, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms cumulative {self_us / 1000:7.1f} ms self  {name.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repo", default=os.getcwd())
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per fake Slack API call")
+    parser.add_argument("--importtime", action="store_true", help="print an -X importtime profile")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    server = FakeServer(fake_slack_app(latency=args.latency)).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, **ENV, SLACK_API_URL=f"{server.url}/api/",
+                       PYTHONPATH=os.path.abspath(args.repo))
+            if args.importtime:
+                import_profile(dict(env, IDENTITY_CACHE_PATH=""), workdir, args.top)
+                return
+            cold = [json.loads(run_child(dict(env, IDENTITY_CACHE_PATH=""), workdir).stdout.splitlines()[-1])
+                    for _ in range(args.runs)]
+            cache_env = dict(env, IDENTITY_CACHE_PATH=os.path.join(workdir, "identity.json"))
+            run_child(cache_env, workdir)
+            warm = [json.loads(run_child(cache_env, workdir).stdout.splitlines()[-1]) for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    report("no identity cache", cold)
+    report("warm identity cache", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Web API latency of the stock WebClient vs the pooled, retrying client built
+by create_web_client(), against a local fake Slack server.
+
+--threads threads make --calls calls each, the mix the bot makes while
+handling messages: chat.postMessage to the target channel, and
+conversations.info / users.info for a few busy channels and users (the
+metadata cache misses after a restart). Then the fake server answers the
+next calls with 503 and 429 to show which client still gets a response: a
+write (chat.postMessage) is only retried on 429, a read (conversations.info)
+also on 503.
+Run from the repository root: python -m benchmarks.bench_web_client
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password",
+}
+
+
+def workload(client, calls: int, thread: int, latencies: list):
+    for i in range(calls):
+        started = time.perf_counter()
+        kind = (thread + i) % 3
+        if kind == 0:
+            client.chat_postMessage(channel="CTARGET", text=f"forward {thread}-{i}")
+        elif kind == 1:
+            client.conversations_info(channel=f"C{i % 4}")
+        else:
+            client.users_info(user=f"U{i % 4}")
+        latencies.append(time.perf_counter() - started)
+
+
+def run(label: str, client, app, threads: int, calls: int):
+    requests_before = len(app["calls"])
+    latencies = []
+    workers = [threading.Thread(target=workload, args=(client, calls, t, latencies)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{label:<8} {len(latencies)} calls in {elapsed:.2f}s, median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms, "
+          f"{len(app['calls']) - requests_before} requests reached the server")
+
+
+def faults(label: str, client, app):
+    calls = {
+        "chat.postMessage": lambda: client.chat_postMessage(channel="CTARGET", text="after fault"),
+        "conversations.info": lambda: client.conversations_info(channel="CFAULT"),
+    }
+    for method, call in calls.items():
+        for status in (503, 429):
+            app["fail_next"][:] = [status]
+            started = time.perf_counter()
+            try:
+                call()
+                outcome = "ok"
+            except Exception as e:
+                outcome = f"failed: {type(e).__name__}"
+            print(f"{label:<8} {method:<18} one {status} from the server: {outcome} "
+                  f"in {time.perf_counter() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=300, help="calls per thread")
+    parser.add_argument("--latency", type=float, default=0.002, help="fake server seconds per call")
+    args = parser.parse_args()
+
+    app = fake_slack_app(latency=args.latency, retry_after=0)
+    server = FakeServer(app).start()
+    os.environ.update(ENV, SLACK_API_URL=f"{server.url}/api/")
+
+    from slack_sdk import WebClient
+    from config import SlackBotConfig
+    from slack_client import create_web_client
+
+    stock = WebClient(token="xoxb-fake", base_url=f"{server.url}/api/")
+    tuned = create_web_client(SlackBotConfig())
+    try:
+        run("stock", stock, app, args.threads, args.calls)
+        run("pooled", tuned, app, args.threads, args.calls)
+        print(f"pooled connections: {tuned.pool.stats()}")
+        faults("stock", stock, app)
+        faults("pooled", tuned, app)
+    finally:
+        tuned.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
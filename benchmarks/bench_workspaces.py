@@ -0,0 +1,130 @@
+"""Throughput of 1 vs N workspaces in one process, and exactly-once actions
+across replicas sharing a lease database.
+
+Workspaces are built the way WorkspaceRunner builds them (own config
+overrides and AppContext each) against one fake Slack and VOIP server. Every
+workspace gets --events tagged messages through handle_message from its own
+sender thread; throughput counts events until all dispatchers drained.
+
+The replica check runs two bots for the same workspace with different
+REPLICA_IDs and one LEASE_DB_PATH, delivers every event to both, and counts
+the forwards that reached Slack.
+Run from the repository root: python -m benchmarks.bench_workspaces
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_servers import FakeServer, fake_slack_app, fake_voip_app
+
+ENV = {
+    "SLACK_BOT_TOKEN": "xoxb-fake", "SLACK_APP_TOKEN": "xapp-fake", "TARGET_TAG": "TAG",
+    "TARGET_CHANNEL": "CTARGET", "DEBUG_MODE": "false", "ADMIN_PW": "password", "METRICS_PORT": "0",
+    "TARGET_SIP1": "SIP/dev1", "DEDUP_DB_PATH": "", "FORWARD_BATCH_WINDOW": "0", "VOIP_PROBE_INTERVAL": "0",
+}
+
+
+class Client:
+    def send_socket_mode_response(self, response: dict):
+        pass
+
+
+def requests(workspace: str, events: int, now: float) -> list:
+    from slack_sdk.socket_mode.request import SocketModeRequest
+    return [
+        SocketModeRequest(type="events_api", envelope_id=f"{workspace}-{i}", payload={
+            "event_id": f"Ev{workspace}{i}",
+            "event": {"type": "message", "channel": f"C{workspace.upper()}{i % 20}", "user": "U1",
+                      "ts": f"{now + i / 1000:.6f}", "text": f"TAG help {i}"},
+        })
+        for i in range(events)
+    ]
+
+
+def build_bots(workspaces: dict) -> list:
+    from slack_bot import SlackBot
+    from workspaces import WorkspaceRunner
+    runner = WorkspaceRunner(workspaces)
+    bots = [SlackBot(context) for context in runner.contexts.values()]
+    for bot in bots:
+        bot.dispatcher.start()
+    return bots
+
+
+def deliver(bots_with_requests: list) -> float:
+    client = Client()
+    started = time.perf_counter()
+    senders = [
+        threading.Thread(target=lambda b=bot, r=reqs: [b.handle_message(client, req) for req in r])
+        for bot, reqs in bots_with_requests
+    ]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    for bot, _ in bots_with_requests:
+        bot.dispatcher.shutdown()
+    return time.perf_counter() - started
+
+
+def throughput(workspace_count: int, events: int, slack, directory: str):
+    workspaces = {
+        f"ws{i}": {"SLACK_BOT_TOKEN": f"xoxb-ws{i}", "SLACK_APP_TOKEN": f"xapp-ws{i}",
+                   "OUTBOX_PATH": os.path.join(directory, "outbox.sqlite3")}
+        for i in range(workspace_count)
+    }
+    bots = build_bots(workspaces)
+    now = time.time() + 1
+    posts_before = sum(1 for method, _ in slack["calls"] if method == "chat.postMessage")
+    elapsed = deliver([(bot, requests(bot.config.workspace, events, now)) for bot in bots])
+    posts = sum(1 for method, _ in slack["calls"] if method == "chat.postMessage") - posts_before
+    for bot in bots:
+        bot.stop()
+    total = workspace_count * events
+    print(f"{workspace_count} workspace(s): {total} events in {elapsed:.2f}s = {total / elapsed:.0f} events/s, "
+          f"{posts} forwards posted")
+
+
+def replicas(events: int, slack, directory: str):
+    lease_db = os.path.join(directory, "leases.sqlite3")
+    bots = []
+    for replica in ("a", "b"):
+        os.environ.update(REPLICA_ID=f"replica-{replica}", LEASE_DB_PATH=lease_db,
+                          OUTBOX_PATH=os.path.join(directory, f"outbox-{replica}.sqlite3"))
+        bots.extend(build_bots({"shared": {}}))
+    now = time.time() + 1
+    posts_before = sum(1 for method, _ in slack["calls"] if method == "chat.postMessage")
+    elapsed = deliver([(bot, requests("shared", events, now)) for bot in bots])
+    posts = sum(1 for method, _ in slack["calls"] if method == "chat.postMessage") - posts_before
+    stats = [bot.leases.stats() for bot in bots]
+    for bot in bots:
+        bot.stop()
+    print(f"2 replicas, each got the same {events} events: {posts} forwards posted in {elapsed:.2f}s, "
+          f"leases {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200, help="events per workspace")
+    parser.add_argument("--workspaces", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    slack = fake_slack_app(latency=0.02)
+    voip = fake_voip_app(latency=0.05)
+    slack_server = FakeServer(slack).start()
+    voip_server = FakeServer(voip).start()
+    os.environ.update(ENV, SLACK_API_URL=f"{slack_server.url}/api/", ARI_URL=f"{voip_server.url}/ari")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for count in args.workspaces:
+                throughput(count, args.events, slack, directory)
+            replicas(args.events, slack, directory)
+    finally:
+        slack_server.stop()
+        voip_server.stop()
+
+
+if __name__ == "__main__":
+    main()
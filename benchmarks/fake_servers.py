@@ -0,0 +1,199 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+from aiohttp import web, WSMsgType
+
+
+class FakeServer:
+    """Runs an aiohttp app on a local port in a background thread."""
+
+    def __init__(self, app: web.Application, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.runner = None
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def start(self) -> "FakeServer":
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return self
+
+    def call(self, coroutine):
+        """Runs a coroutine on the server loop and returns its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def fake_voip_app(latency: float = 0.05) -> web.Application:
+    """Fake Asterisk ARI and Twilio call endpoints answering after `latency` seconds.
+
+    app["faults"][provider] injects failures: {"status": 500} answers with that
+    status, {"delay": 30} makes every request of that provider, including its
+    health endpoint, hang for that long and then answer 504.
+    """
+    app = web.Application()
+    app["calls"] = []
+    app["probes"] = []
+    app["faults"] = {}
+
+    async def fault(provider: str):
+        injected = app["faults"].get(provider, {})
+        await asyncio.sleep(latency + injected.get("delay", 0))
+        status = injected.get("status") or (504 if injected.get("delay") else None)
+        if status:
+            return web.json_response({"error": f"injected {status}"}, status=status)
+        return None
+
+    async def ari_channels(request):
+        error = await fault("asterisk")
+        if error:
+            return error
+        app["calls"].append(("asterisk", request.query.get("endpoint")))
+        return web.json_response({"id": str(uuid.uuid4())})
+
+    async def ari_info(request):
+        app["probes"].append("asterisk")
+        return await fault("asterisk") or web.json_response({"system": {"version": "fake"}})
+
+    async def twilio_calls(request):
+        error = await fault("twilio")
+        if error:
+            return error
+        data = await request.post()
+        app["calls"].append(("twilio", data.get("To")))
+        return web.json_response({"sid": f"CA{uuid.uuid4().hex}"}, status=201)
+
+    async def twilio_account(request):
+        app["probes"].append("twilio")
+        return await fault("twilio") or web.json_response({"sid": request.match_info["sid"], "status": "active"})
+
+    app.router.add_post("/ari/channels", ari_channels)
+    app.router.add_get("/ari/asterisk/info", ari_info)
+    app.router.add_post("/2010-04-01/Accounts/{sid}/Calls.json", twilio_calls)
+    app.router.add_get("/2010-04-01/Accounts/{sid}.json", twilio_account)
+    return app
+
+
+def fake_slack_app(latency: float = 0.02, ratelimit_every: int = 0, retry_after: int = 1) -> web.Application:
+    """Fake Slack Web API and Socket Mode endpoint.
+
+    Every `ratelimit_every`-th Web API call answers 429 ratelimited, and the
+    next calls answer with the statuses queued in app["fail_next"]. Fill
+    app["channels"] and app["users"] ({id: name}) for conversations.list,
+    users.list and the info methods, and app["history"] ({channel: [message]})
+    for conversations.history. Use push_envelope() and drop_socket() to drive
+    the WebSocket side.
+    """
+    app = web.Application()
+    app["calls"] = []
+    app["sockets"] = []
+    app["acks"] = []
+    app["next_socket"] = 0
+    app["channels"] = {}
+    app["users"] = {}
+    app["fail_next"] = []
+    app["history"] = {}
+
+    async def api_method(request):
+        await asyncio.sleep(latency)
+        method = request.match_info["method"]
+        data = dict(await request.post())
+        if not data and request.can_read_body:
+            data = await request.json()
+        app["calls"].append((method, data))
+        if method == "apps.connections.open":
+            return web.json_response({"ok": True, "url": f"ws://{request.host}/link"})
+        if ratelimit_every and len(app["calls"]) % ratelimit_every == 0:
+            return web.json_response({"ok": False, "error": "ratelimited"}, status=429,
+                                     headers={"Retry-After": str(retry_after)})
+        if app["fail_next"]:
+            status = app["fail_next"].pop(0)
+            headers = {"Retry-After": str(retry_after)} if status == 429 else None
+            return web.json_response({"ok": False, "error": f"injected {status}"}, status=status, headers=headers)
+        if method == "auth.test":
+            return web.json_response({"ok": True, "url": "https://fake.slack.com/", "team": "fake",
+                                      "user": "bot", "user_id": "U0BOT", "bot_id": "B0BOT"})
+        if method in ("conversations.list", "users.list"):
+            table, field = ("channels", "channels") if method == "conversations.list" else ("users", "members")
+            ids = sorted(app[table])
+            start = int(data.get("cursor") or 0)
+            end = start + int(data.get("limit") or 100)
+            items = [{"id": i, "name": app[table][i], "profile": {"display_name": app[table][i]}}
+                     for i in ids[start:end]]
+            return web.json_response({"ok": True, field: items,
+                                      "response_metadata": {"next_cursor": str(end) if end < len(ids) else ""}})
+        if method == "conversations.info":
+            channel = data.get("channel")
+            name = app["channels"].get(channel, channel.lower())
+            return web.json_response({"ok": True, "channel": {"id": channel, "name": name}})
+        if method == "users.info":
+            user = data.get("user")
+            name = app["users"].get(user, user.lower())
+            return web.json_response({"ok": True, "user": {"id": user, "name": name,
+                                                           "profile": {"display_name": name}}})
+        if method == "conversations.history":
+            oldest = float(data.get("oldest") or 0)
+            messages = sorted((m for m in app["history"].get(data.get("channel"), []) if float(m["ts"]) > oldest),
+                              key=lambda m: float(m["ts"]), reverse=True)
+            start = int(data.get("cursor") or 0)
+            end = start + int(data.get("limit") or 100)
+            return web.json_response({"ok": True, "messages": messages[start:end], "has_more": end < len(messages),
+                                      "response_metadata": {"next_cursor": str(end) if end < len(messages) else ""}})
+        if method == "chat.getPermalink":
+            ts = data.get("message_ts", "")
+            return web.json_response({"ok": True, "permalink":
+                                      f"https://fake.slack.com/archives/{data.get('channel')}/p{ts.replace('.', '')}"})
+        return web.json_response({"ok": True, "channel": data.get("channel"), "ts": f"{time.time():.6f}"})
+
+    async def socket_mode(request):
+        ws = web.WebSocketResponse(autoping=True)
+        await ws.prepare(request)
+        app["sockets"].append(ws)
+        await ws.send_json({"type": "hello", "num_connections": len(app["sockets"])})
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    app["acks"].append(json.loads(message.data).get("envelope_id"))
+        finally:
+            if ws in app["sockets"]:
+                app["sockets"].remove(ws)
+        return ws
+
+    app.router.add_post("/api/{method}", api_method)
+    app.router.add_get("/link", socket_mode)
+    return app
+
+
+async def push_envelope(app: web.Application, envelope: dict) -> bool:
+    """Sends an envelope over the open sockets in round-robin, like Slack does."""
+    sockets = [ws for ws in app["sockets"] if not ws.closed]
+    if not sockets:
+        return False
+    app["next_socket"] = (app["next_socket"] + 1) % len(sockets)
+    await sockets[app["next_socket"]].send_json(envelope)
+    return True
+
+
+async def drop_socket(app: web.Application, index: int = 0):
+    """Closes one socket from the server side, simulating a Slack disconnect."""
+    await app["sockets"][index].close()
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+# Requests per minute for each Slack Web API rate limit tier
+TIER_LIMITS = {
+    "tier1": 1,
+    "tier2": 20,
+    "tier3": 50,
+    "tier4": 100,
+}
+
+METHOD_TIERS = {
+    "chat_postMessage": "special",
+    "chat_update": "tier3",
+    "chat_getPermalink": "tier4",
+    "conversations_history": "tier3",
+    "conversations_info": "tier3",
+    "conversations_list": "tier2",
+    "users_info": "tier4",
+    "users_list": "tier2",
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Drains the bucket so nobody sends for `seconds`, used after a ratelimited response."""
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+            self.updated = time.monotonic()
+
+
+class Broadcaster:
+    """Posts one message to many channels concurrently within Slack rate limits.
+
+    Every Web API method shares a token bucket sized by its tier. chat.postMessage
+    is in the "special" tier, its rate comes from `post_rate` (messages per second).
+    """
+
+    def __init__(self, web_client: WebClient, workers: int = 8, post_rate: float = 10.0, max_retries: int = 3):
+        self.web_client = web_client
+        self.workers = workers
+        self.max_retries = max_retries
+        self.buckets = {}
+        for method, tier in METHOD_TIERS.items():
+            rate = post_rate if tier == "special" else TIER_LIMITS[tier] / 60
+            self.buckets[method] = TokenBucket(rate, max(1.0, rate))
+
+    def call(self, method: str, **kwargs):
+        """Calls a Web API method through its token bucket, retrying on ratelimited errors."""
+        bucket = self.buckets.get(method)
+        attempt = 0
+        while True:
+            attempt += 1
+            if bucket:
+                bucket.acquire()
+            try:
+                return getattr(self.web_client, method)(**kwargs)
+            except SlackApiError as e:
+                if e.response.get('error') != 'ratelimited' or attempt > self.max_retries:
+                    raise
+                retry_after = float(e.response.headers.get('Retry-After', 1))
+                logger.info(f"Rate limited on {method}, retrying in {retry_after}s (attempt {attempt})")
+                if bucket:
+                    bucket.pause(retry_after)
+                else:
+                    time.sleep(retry_after)
+
+    def _deliver(self, channel: str, text: str, dry_run: bool) -> dict:
+        started = time.monotonic()
+        result = {"channel": channel, "ok": False, "error": None, "latency": None}
+        try:
+            if dry_run:
+                self.buckets["chat_postMessage"].acquire()
+            else:
+                self.call("chat_postMessage", channel=channel, text=text)
+            result["ok"] = True
+        except SlackApiError as e:
+            result["error"] = e.response.get('error')
+            logger.error(f"Failed to send message to {channel}: {result['error']}")
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"Failed to send message to {channel}: {e}")
+        result["latency"] = time.monotonic() - started
+        return result
+
+    def broadcast(self, messages: dict, dry_run: bool = False) -> list:
+        """Sends {channel: text} and returns one delivery result per channel."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="broadcast") as executor:
+            futures = [executor.submit(self._deliver, channel, text, dry_run) for channel, text in messages.items()]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def format_report(results: list, dry_run: bool = False) -> str:
+        delivered = sum(1 for r in results if r["ok"])
+        lines = [f"{'[DRY RUN] ' if dry_run else ''}Delivered {delivered}/{len(results)}"]
+        for r in results:
+            if not r["ok"]:
+                lines.append(f"<#{r['channel']}> - failed: {r['error']}")
+        return "\n".join(lines)
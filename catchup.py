@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+
+from slack_sdk.errors import SlackApiError
+
+from broadcaster import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class CatchUp:
+    """Fetches messages that watched channels received while Socket Mode was down.
+
+    advance() keeps a per-channel high-water mark: the newest message ts
+    ingested live. disconnected() snapshots the marks when a connection is
+    lost, so events that arrive on other connections or right after the
+    reconnect don't move the start of the gap. After the reconnect,
+    request() pages conversations_history for every watched channel from
+    its snapshotted mark, bounded by `window` seconds and
+    `max_pages` pages, and feeds the messages oldest first to
+    `ingest(event)`, the normal classification path, so dedup drops anything
+    that was also delivered live. `call(method, **kwargs)` is
+    Broadcaster.call, so history pages share the conversations_history
+    rate limit bucket, and ingestion is paced at `rate` messages per second
+    so a long outage does not flood the dispatcher ahead of live events.
+    While a channel's history is being ingested, hold() defers its live
+    events and replays them in arrival order right after the history, so
+    older missed messages are dispatched before newer live ones. Other
+    channels are not held, and pacing is skipped while live events of the
+    channel wait, so the hold lasts no longer than the history itself.
+    """
+
+    def __init__(self, call, ingest, channels, window: float = 900.0, max_pages: int = 5, page_size: int = 200,
+                 rate: float = 20.0, connect_timeout: float = 60.0):
+        self.call = call
+        self.ingest = ingest
+        self.channels = channels
+        self.window = window
+        self.max_pages = max_pages
+        self.page_size = page_size
+        self.bucket = TokenBucket(rate, max(1.0, rate))
+        self.connect_timeout = connect_timeout
+        self.lock = threading.Lock()
+        self.marks = {}
+        self.since = None
+        self.held = {}
+        self.running = False
+        self.pending = False
+        self.closed = False
+        self.counters = {"runs": 0, "pages": 0, "messages": 0, "truncated": 0, "held": 0}
+
+    def advance(self, channel: str, ts: float):
+        with self.lock:
+            if ts > self.marks.get(channel, 0.0):
+                self.marks[channel] = ts
+
+    def disconnected(self):
+        with self.lock:
+            if self.since is None:
+                self.since = dict(self.marks)
+
+    def holding(self, channel: str) -> bool:
+        with self.lock:
+            return channel in self.held
+
+    def hold(self, channel: str, func, *args) -> bool:
+        """Defers func(*args) until the catch-up of `channel` is done. Returns False if none is running."""
+        with self.lock:
+            held = self.held.get(channel)
+            if held is None:
+                return False
+            held.append((func, args))
+            self.counters["held"] += 1
+            return True
+
+    def _release(self, channel: str):
+        while True:
+            with self.lock:
+                held = self.held.get(channel)
+                if not held:
+                    self.held.pop(channel, None)
+                    return
+                self.held[channel] = []
+            for func, args in held:
+                try:
+                    func(*args)
+                except Exception as e:
+                    logger.error(f"Error handling held event of {channel}: {e}", exc_info=True)
+
+    def request(self, connected=None):
+        """Schedules a catch-up once `connected()` is true; runs at most one at a time."""
+        if self.window <= 0:
+            return
+        with self.lock:
+            if self.closed:
+                return
+            if self.running:
+                self.pending = True
+                return
+            self.running = True
+        threading.Thread(target=self._run, args=(connected,), name="catch-up", daemon=True).start()
+
+    def _run(self, connected):
+        deadline = time.monotonic() + self.connect_timeout
+        while connected is not None and not connected() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        while True:
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Error in reconnect catch-up: {e}", exc_info=True)
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
+                self.pending = False
+
+    def run(self) -> int:
+        started = time.monotonic()
+        floor = time.time() - self.window
+        ingested = 0
+        channels = sorted(self.channels())
+        with self.lock:
+            since = self.since if self.since is not None else dict(self.marks)
+            self.since = None
+        for channel in channels:
+            oldest = max(since.get(channel, 0.0), floor)
+            with self.lock:
+                self.held.setdefault(channel, [])
+            try:
+                for message in self._history(channel, oldest):
+                    with self.lock:
+                        waiting = bool(self.held.get(channel))
+                    if not waiting:
+                        self.bucket.acquire()
+                    self.ingest(dict(message, channel=channel))
+                    ingested += 1
+            finally:
+                self._release(channel)
+        with self.lock:
+            self.counters["runs"] += 1
+            self.counters["messages"] += ingested
+        logger.info(f"Catch-up ingested {ingested} messages in {time.monotonic() - started:.2f}s")
+        return ingested
+
+    def _history(self, channel: str, oldest: float) -> list:
+        messages = []
+        cursor = None
+        for _ in range(self.max_pages):
+            try:
+                response = self.call("conversations_history", channel=channel, oldest=f"{oldest:.6f}",
+                                     limit=self.page_size, cursor=cursor)
+            except SlackApiError as e:
+                logger.error(f"Error fetching history of {channel} for catch-up: {e.response['error']}")
+                break
+            with self.lock:
+                self.counters["pages"] += 1
+            messages.extend(response.get("messages", []))
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+        else:
+            if cursor:
+                logger.info(f"Catch-up of {channel} stopped after {self.max_pages} pages")
+                with self.lock:
+                    self.counters["truncated"] += 1
+        return sorted(messages, key=lambda message: float(message.get("ts", 0)))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters, channels=len(self.marks))
+
+    def close(self):
+        with self.lock:
+            self.closed = True
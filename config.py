@@ -1,6 +1,10 @@
 import os
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import socket
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from dotenv import load_dotenv
 import datetime
 import json
@@ -13,6 +17,34 @@ def debug_mode_to_bool():
     return True if debug_mode == "True" else False
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line. Fields passed as extra={"fields": {...}} are merged in."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class PayloadSampler:
+    """Decides per event whether its full payload gets logged at DEBUG level."""
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = rate
+
+    def sample(self) -> bool:
+        if self.rate >= 1:
+            return True
+        return self.rate > 0 and random.random() < self.rate
+
+
 def setup_logging():
     log_directory = "logs"
     if not os.path.exists(log_directory):
@@ -21,8 +53,11 @@ def setup_logging():
     time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     log_file_path = os.path.join(log_directory, f"slack_bot_{time}.log")
 
-    file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        file_formatter = console_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+        console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 
     file_handler = RotatingFileHandler(
         log_file_path,
@@ -36,9 +71,14 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
 
+    # Handlers write from a background thread, callers only put records on a queue
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
     root_logger = logging.getLogger()
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
     debug_mode = debug_mode_to_bool()
     if debug_mode:
         root_logger.setLevel(logging.DEBUG)
@@ -51,37 +91,169 @@ def setup_logging():
     return root_logger
 
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 
 def clean_json_string(value: str):
     return value.strip().strip("'").strip('"')
 
 
+def env_lookup(overrides: dict = None):
+    """getenv() that looks in a workspace's overrides before the process environment."""
+    overrides = overrides or {}
+
+    def getenv(key: str, default: str = None):
+        value = overrides.get(key)
+        return os.getenv(key, default) if value is None else str(value)
+
+    return getenv
+
+
+def load_workspaces() -> dict:
+    """Returns {workspace name: overrides} from WORKSPACES_FILE, or {} in single workspace mode.
+
+    The file is a JSON object mapping each workspace name to the environment
+    variables that differ from the process environment (tokens, channels, ...).
+    """
+    path = os.getenv("WORKSPACES_FILE")
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def workspace_path(path: str, workspace: str) -> str:
+    """data/outbox.sqlite3 -> data/outbox-<workspace>.sqlite3, so workspaces don't share files."""
+    if not path or not workspace:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{workspace}{extension}"
+
+
+class RoutingLists:
+    """Routing lists that can be re-read from the environment at runtime (SIGHUP)."""
+
+    __slots__ = ("vip_channels", "vip_channel_set", "new_api_chat_ids", "old_api_chat_ids", "routing_rules")
+
+    def __init__(self, overrides: dict = None):
+        set_ = object.__setattr__
+        getenv = env_lookup(overrides)
+        vip_channels = getenv("VIP_CHANNELS")
+        set_(self, "vip_channels", vip_channels)
+        set_(self, "vip_channel_set", frozenset(vip_channels.split(',')) if vip_channels else frozenset())
+        set_(self, "new_api_chat_ids", json.loads(clean_json_string(getenv("NEW_API_CHAT_IDS", "{}"))))
+        set_(self, "old_api_chat_ids", json.loads(clean_json_string(getenv("OLD_API_CHAT_IDS", "{}"))))
+        set_(self, "routing_rules", json.loads(clean_json_string(getenv("ROUTING_RULES", "{}"))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
 class SlackBotConfig:
-    def __init__(self):
-        self.bot_token = os.getenv("SLACK_BOT_TOKEN")
-        self.app_token = os.getenv("SLACK_APP_TOKEN")
-        self.target_channel = os.getenv("TARGET_CHANNEL")
-        self.tag = os.getenv("TARGET_TAG")
-        self.admin_password = os.getenv("ADMIN_PW", "password")
+    """Settings parsed and validated once at startup.
+
+    The object is immutable. Only the routing lists can change, by swapping
+    the whole RoutingLists snapshot in reload_routing().
+    """
+
+    __slots__ = (
+        "bot_token", "app_token", "target_channel", "tag", "admin_password", "debug_mode", "commands",
+        "routing", "server_ip", "ari_username", "ari_password", "target_sip_1", "target_sip_2",
+        "twilio_channel", "twilio_bot", "twilio_account_sid", "twilio_account_token", "twilio_number",
+        "twilio_sip", "twilio_sip_list", "ari_url", "asterisk_call_timeout", "twilio_api_url",
+        "twilio_call_timeout", "voip_failure_threshold", "voip_reset_timeout", "voip_probe_interval",
+        "voip_probe_timeout", "dedup_max_entries", "dedup_ttl", "dedup_db_path", "permalink_cache_size",
+        "metadata_ttl", "metadata_max_entries", "metadata_warm",
+        "broadcast_workers", "broadcast_rate", "dev_call_window", "dev_call_twilio_delay", "dev_call_max_live",
+        "metrics_port", "log_payload_sample_rate", "slack_api_url", "slack_timeout", "slack_method_timeouts",
+        "slack_pool_size", "slack_ratelimit_retries", "slack_server_error_retries", "socket_runtime",
+        "socket_connections",
+        "reconnect_base_delay", "reconnect_max_delay", "forward_batch_window", "forward_batch_max",
+        "outbox_path", "outbox_sync", "outbox_batch_size", "outbox_batch_interval", "outbox_max_attempts",
+        "lease_db_path", "lease_ttl", "replica_id", "workspace", "overrides", "dispatcher_workers",
+        "dispatcher_queue_size", "dispatcher_paging_weight", "paging_slo", "identity_cache_path",
+        "restart_base_delay", "restart_max_delay", "catchup_window", "catchup_max_pages", "catchup_page_size",
+        "catchup_rate", "_frozen",
+    )
+
+    def __init__(self, workspace: str = None, overrides: dict = None):
+        self._frozen = False
+        getenv = env_lookup(overrides)
+        self.workspace = workspace
+        self.overrides = dict(overrides or {})
+        self.bot_token = getenv("SLACK_BOT_TOKEN")
+        self.app_token = getenv("SLACK_APP_TOKEN")
+        self.target_channel = getenv("TARGET_CHANNEL")
+        self.tag = getenv("TARGET_TAG")
+        self.admin_password = getenv("ADMIN_PW", "password")
         self.debug_mode = debug_mode_to_bool()
-        self.commands = ["/rocket", "/old_api_close_reception", "/new_api_close_reception"]
-        self.new_api_chat_ids = json.loads(clean_json_string(os.getenv("NEW_API_CHAT_IDS", "{}")))
-        self.old_api_chat_ids = json.loads(clean_json_string(os.getenv("OLD_API_CHAT_IDS", "{}")))
-        self.server_ip = os.getenv("ASTERISK_HOST")
-        self.ari_username = os.getenv("ARI_USERNAME")
-        self.ari_password = os.getenv("ARI_PASSWORD")
-        self.target_sip_1 = os.getenv("TARGET_SIP1")
-        self.target_sip_2 = os.getenv("TARGET_SIP2")
-        self.vip_channels = os.getenv("VIP_CHANNELS")
-        self.twilio_channel = os.getenv("TWILIO_CHANNEL")
-        self.twilio_bot = os.getenv("TWILIO_BOT")
-        self.twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        self.twilio_account_token = os.getenv("TWILIO_ACCOUNT_TOKEN")
-        self.twilio_number = os.getenv("TWILIO_NUMBER")
-        self.twilio_sip = os.getenv("TWILIO_SIP")
-        self.twilio_sip_list = [s.strip() for s in self.twilio_sip.split(',')] if self.twilio_sip else []
+        self.commands = ("/rocket", "/old_api_close_reception", "/new_api_close_reception")
+        self.routing = RoutingLists(self.overrides)
+        self.server_ip = getenv("ASTERISK_HOST")
+        self.ari_username = getenv("ARI_USERNAME")
+        self.ari_password = getenv("ARI_PASSWORD")
+        self.target_sip_1 = getenv("TARGET_SIP1")
+        self.target_sip_2 = getenv("TARGET_SIP2")
+        self.twilio_channel = getenv("TWILIO_CHANNEL")
+        self.twilio_bot = getenv("TWILIO_BOT")
+        self.twilio_account_sid = getenv("TWILIO_ACCOUNT_SID")
+        self.twilio_account_token = getenv("TWILIO_ACCOUNT_TOKEN")
+        self.twilio_number = getenv("TWILIO_NUMBER")
+        self.twilio_sip = getenv("TWILIO_SIP")
+        self.twilio_sip_list = tuple(s.strip() for s in self.twilio_sip.split(',')) if self.twilio_sip else ()
+        self.ari_url = getenv("ARI_URL")
+        self.asterisk_call_timeout = float(getenv("ASTERISK_CALL_TIMEOUT", "60"))
+        self.twilio_api_url = getenv("TWILIO_API_URL", "https://api.twilio.com")
+        self.twilio_call_timeout = float(getenv("TWILIO_CALL_TIMEOUT", "10"))
+        self.voip_failure_threshold = int(getenv("VOIP_FAILURE_THRESHOLD", "2"))
+        self.voip_reset_timeout = float(getenv("VOIP_RESET_TIMEOUT", "60"))
+        self.voip_probe_interval = float(getenv("VOIP_PROBE_INTERVAL", "30"))
+        self.voip_probe_timeout = float(getenv("VOIP_PROBE_TIMEOUT", "5"))
+        self.dedup_max_entries = int(getenv("DEDUP_MAX_ENTRIES", "10000"))
+        self.dedup_ttl = float(getenv("DEDUP_TTL", "3600"))
+        self.dedup_db_path = workspace_path(getenv("DEDUP_DB_PATH"), workspace)
+        self.permalink_cache_size = int(getenv("PERMALINK_CACHE_SIZE", "1000"))
+        self.metadata_ttl = float(getenv("METADATA_TTL", "21600"))
+        self.metadata_max_entries = int(getenv("METADATA_MAX_ENTRIES", "20000"))
+        self.metadata_warm = getenv("METADATA_WARM", "true").lower() == "true"
+        self.broadcast_workers = int(getenv("BROADCAST_WORKERS", "8"))
+        self.broadcast_rate = float(getenv("BROADCAST_RATE", "10"))
+        self.dev_call_window = float(getenv("DEV_CALL_WINDOW", "300"))
+        self.dev_call_twilio_delay = float(getenv("DEV_CALL_TWILIO_DELAY", "120"))
+        self.dev_call_max_live = int(getenv("DEV_CALL_MAX_LIVE", "2"))
+        self.metrics_port = int(getenv("METRICS_PORT", "9100"))
+        self.log_payload_sample_rate = float(getenv("LOG_PAYLOAD_SAMPLE_RATE", "1"))
+        self.slack_api_url = getenv("SLACK_API_URL", "https://slack.com/api/")
+        self.slack_timeout = int(getenv("SLACK_TIMEOUT", "30"))
+        self.slack_method_timeouts = json.loads(clean_json_string(getenv("SLACK_METHOD_TIMEOUTS", "{}")))
+        self.slack_pool_size = int(getenv("SLACK_POOL_SIZE", "8"))
+        self.slack_ratelimit_retries = int(getenv("SLACK_RATELIMIT_RETRIES", "1"))
+        self.slack_server_error_retries = int(getenv("SLACK_SERVER_ERROR_RETRIES", "2"))
+        self.socket_runtime = getenv("SOCKET_RUNTIME", "threaded")
+        self.socket_connections = int(getenv("SOCKET_CONNECTIONS", "2"))
+        self.reconnect_base_delay = float(getenv("RECONNECT_BASE_DELAY", "1"))
+        self.reconnect_max_delay = float(getenv("RECONNECT_MAX_DELAY", "60"))
+        self.forward_batch_window = float(getenv("FORWARD_BATCH_WINDOW", "30"))
+        self.forward_batch_max = int(getenv("FORWARD_BATCH_MAX", "20"))
+        self.outbox_path = workspace_path(getenv("OUTBOX_PATH", "data/outbox.sqlite3"), workspace)
+        self.outbox_sync = getenv("OUTBOX_SYNC", "normal").lower()
+        self.outbox_batch_size = int(getenv("OUTBOX_BATCH_SIZE", "1"))
+        self.outbox_batch_interval = float(getenv("OUTBOX_BATCH_INTERVAL", "0.001"))
+        self.outbox_max_attempts = int(getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+        self.lease_db_path = getenv("LEASE_DB_PATH", "")
+        self.lease_ttl = float(getenv("LEASE_TTL", "3600"))
+        self.replica_id = getenv("REPLICA_ID") or socket.gethostname()
+        self.catchup_window = float(getenv("CATCHUP_WINDOW", "900"))
+        self.catchup_max_pages = int(getenv("CATCHUP_MAX_PAGES", "5"))
+        self.catchup_page_size = int(getenv("CATCHUP_PAGE_SIZE", "200"))
+        self.catchup_rate = float(getenv("CATCHUP_RATE", "20"))
+        self.dispatcher_workers = int(getenv("DISPATCHER_WORKERS", "4"))
+        self.dispatcher_queue_size = int(getenv("DISPATCHER_QUEUE_SIZE", "100"))
+        self.dispatcher_paging_weight = int(getenv("DISPATCHER_PAGING_WEIGHT", "4"))
+        self.paging_slo = float(getenv("PAGING_SLO_SECONDS", "1"))
+        self.identity_cache_path = workspace_path(getenv("IDENTITY_CACHE_PATH", "data/identity.json"), workspace)
+        self.restart_base_delay = float(getenv("RESTART_BASE_DELAY", "1"))
+        self.restart_max_delay = float(getenv("RESTART_MAX_DELAY", "60"))
 
         logger.info(f"Twilio accounts to call - {self.twilio_sip_list}")
 
@@ -94,3 +266,36 @@ class SlackBotConfig:
         if not all([self.bot_token, self.app_token, self.target_channel, self.tag, self.admin_password]):
             logger.error("Missing required environment variables")
             raise ValueError("SLACK_BOT_TOKEN, SLACK_APP_TOKEN, ADMIN_PW, TARGET_TAG and TARGET_CHANNEL must be set")
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is immutable, cannot set {name}")
+        object.__setattr__(self, name, value)
+
+    @property
+    def vip_channels(self):
+        return self.routing.vip_channels
+
+    @property
+    def new_api_chat_ids(self):
+        return self.routing.new_api_chat_ids
+
+    @property
+    def old_api_chat_ids(self):
+        return self.routing.old_api_chat_ids
+
+    @property
+    def routing_rules(self):
+        return self.routing.routing_rules
+
+    def reload_routing(self) -> RoutingLists:
+        """Re-reads .env and the environment and swaps in new routing lists."""
+        load_dotenv(override=True)
+        if self.workspace:
+            object.__setattr__(self, "overrides", load_workspaces().get(self.workspace, self.overrides))
+        routing = RoutingLists(self.overrides)
+        object.__setattr__(self, "routing", routing)
+        logger.info(f"Routing lists reloaded: {len(routing.vip_channel_set)} VIP channels, "
+                    f"{len(routing.new_api_chat_ids)} new API chats, {len(routing.old_api_chat_ids)} old API chats")
+        return routing
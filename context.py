@@ -0,0 +1,55 @@
+import logging
+
+from config import SlackBotConfig, RoutingLists
+from slack_client import create_web_client
+from escalation import EscalationEngine
+from broadcaster import Broadcaster
+
+logger = logging.getLogger(__name__)
+
+
+class AppContext:
+    """Objects shared by the whole process: config, Slack client and HTTP engines.
+
+    Built once in main() and injected into every component instead of each
+    one creating its own config or client.
+    """
+
+    __slots__ = ("config", "web_client", "escalation", "broadcaster", "reload_listeners")
+
+    def __init__(self, config: SlackBotConfig = None):
+        self.config = config or SlackBotConfig()
+        try:
+            self.web_client = create_web_client(self.config)
+            logger.info("WebClient initialized")
+        except Exception as e:
+            logger.error(f"Error initializing WebClient: {e}")
+            raise
+        self.escalation = EscalationEngine(workspace=self.config.workspace or "default")
+        self.broadcaster = Broadcaster(
+            self.web_client,
+            workers=self.config.broadcast_workers,
+            post_rate=self.config.broadcast_rate
+        )
+        self.reload_listeners = []
+
+    def on_reload(self, listener):
+        """Registers listener(routing) to be called after routing lists are reloaded."""
+        self.reload_listeners.append(listener)
+
+    def remove_reload_listener(self, listener):
+        if listener in self.reload_listeners:
+            self.reload_listeners.remove(listener)
+
+    def reload(self) -> RoutingLists:
+        routing = self.config.reload_routing()
+        for listener in self.reload_listeners:
+            try:
+                listener(routing)
+            except Exception as e:
+                logger.error(f"Error applying reloaded routing lists: {e}", exc_info=True)
+        return routing
+
+    def close(self):
+        self.escalation.close()
+        self.web_client.close()
@@ -0,0 +1,130 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def make_dedup_key(channel: str, ts: str, event_id: str = None) -> str:
+    if ts and ts != '0':
+        return f"{channel}:{ts}"
+    return f"event:{event_id}"
+
+
+class DedupStore:
+    """In-memory LRU set of processed message keys with a TTL.
+
+    Memory is bounded by max_entries: the oldest key is evicted when the
+    store is full, expired keys are dropped when they reach the LRU end.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seen(self, key: str) -> bool:
+        """Returns True if key was already recorded, otherwise records it."""
+        now = time.monotonic()
+        with self.lock:
+            expires = self.entries.get(key)
+            if expires is not None and expires > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            self.entries[key] = now + self.ttl
+            self.entries.move_to_end(key)
+            self._evict(now)
+            return False
+
+    def _evict(self, now: float):
+        while self.entries:
+            key, expires = next(iter(self.entries.items()))
+            if len(self.entries) <= self.max_entries and expires > now:
+                break
+            del self.entries[key]
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        pass
+
+
+class SqliteDedupStore(DedupStore):
+    """Dedup store persisted in sqlite, so it survives process restarts."""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 3600.0):
+        super().__init__(max_entries, ttl)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS processed (key TEXT PRIMARY KEY, expires REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS processed_expires ON processed (expires)")
+        self.size = self.connection.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+        logger.info(f"Dedup store opened at {path} with {self.size} entries")
+
+    def seen(self, key: str) -> bool:
+        # Wall clock instead of monotonic, expiry times have to stay valid across restarts
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT expires FROM processed WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] > now:
+                self.hits += 1
+                return True
+            self.misses += 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO processed (key, expires) VALUES (?, ?)", (key, now + self.ttl))
+            if row is None:
+                self.size += 1
+            if self.size > self.max_entries:
+                self._evict(now)
+            return False
+
+    def _evict(self, now: float):
+        removed = self.connection.execute("DELETE FROM processed WHERE expires <= ?", (now,)).rowcount
+        overflow = self.size - removed - self.max_entries
+        if overflow > 0:
+            removed += self.connection.execute(
+                "DELETE FROM processed WHERE key IN (SELECT key FROM processed ORDER BY expires LIMIT ?)",
+                (overflow,)).rowcount
+        self.size -= removed
+        self.evictions += removed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def create_dedup_store(config) -> DedupStore:
+    if config.dedup_db_path:
+        return SqliteDedupStore(config.dedup_db_path, config.dedup_max_entries, config.dedup_ttl)
+    return DedupStore(config.dedup_max_entries, config.dedup_ttl)
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+
+from metrics import STAGE_LATENCY, DISPATCHER_QUEUE_DEPTH, DISPATCH_WAIT, DISPATCH_SLO_MISSED
+
+logger = logging.getLogger(__name__)
+
+PAGING = "paging"
+ROUTINE = "routine"
+DEFAULT_WEIGHTS = {PAGING: 4, ROUTINE: 1}
+
+
+class PriorityLane:
+    """The queues of one worker: a bounded deque per priority class.
+
+    get() picks among the non-empty classes by smooth weighted round robin,
+    so with both classes backlogged paging events get `weights[PAGING]` turns
+    for every routine one, and routine traffic is never starved. A full
+    routine queue does not block paging events, each class has its own bound.
+    """
+
+    def __init__(self, maxsize: int, weights: dict):
+        self.maxsize = maxsize
+        self.weights = weights
+        self.queues = {priority: deque() for priority in weights}
+        self.current = {priority: 0 for priority in weights}
+        self.condition = threading.Condition()
+        self.stopped = False
+
+    def put(self, priority: str, item, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            q = self.queues[priority]
+            while len(q) >= self.maxsize:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            q.append(item)
+            self.condition.notify_all()
+            return True
+
+    def get(self):
+        """Returns (priority, item), or None once stopped and drained."""
+        with self.condition:
+            while True:
+                ready = [priority for priority, q in self.queues.items() if q]
+                if ready:
+                    break
+                if self.stopped:
+                    return None
+                self.condition.wait()
+            total = 0
+            for priority in ready:
+                self.current[priority] += self.weights[priority]
+                total += self.weights[priority]
+            chosen = max(ready, key=self.current.get)
+            self.current[chosen] -= total
+            item = self.queues[chosen].popleft()
+            self.condition.notify_all()
+            return chosen, item
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def qsize(self) -> int:
+        with self.condition:
+            return sum(len(q) for q in self.queues.values())
+
+
+class EventDispatcher:
+    """Runs event handlers on a bounded pool of worker threads.
+
+    Every key (usually a channel id) is pinned to one worker, so events from
+    the same channel and priority are handled in arrival order while
+    different channels are processed in parallel. Paging events (dev calls,
+    VIP calls) are queued apart from routine forwards and dequeued first by
+    weight; their queue wait is checked against `paging_slo` seconds.
+    """
+
+    def __init__(self, workers: int = 4, max_queue_size: int = 100, put_timeout: float = 5.0,
+                 weights: dict = None, paging_slo: float = 1.0, workspace: str = "default"):
+        self.workers_count = max(1, workers)
+        self.put_timeout = put_timeout
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.paging_slo = paging_slo
+        self.workspace = workspace
+        per_worker_size = max(1, max_queue_size // self.workers_count)
+        self.lanes = [PriorityLane(per_worker_size, self.weights) for _ in range(self.workers_count)]
+        self.workers = []
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.processed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_wait_by_priority = {priority: 0.0 for priority in self.weights}
+        self.slo_missed = 0
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for i, lane in enumerate(self.lanes):
+            worker = threading.Thread(target=self._worker, args=(lane,), name=f"dispatcher-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logger.info(f"EventDispatcher started with {self.workers_count} workers, weights {self.weights}")
+
+    def submit(self, key: str, func, *args, priority: str = ROUTINE) -> bool:
+        if not self.running:
+            logger.error(f"Dispatcher is not running, dropping {func.__name__} for key={key}")
+            return False
+        lane = self.lanes[zlib.crc32(str(key).encode()) % self.workers_count]
+        if not lane.put(priority, (time.monotonic(), func, args), self.put_timeout):
+            with self.lock:
+                self.rejected += 1
+            logger.error(f"Dispatcher {priority} queue is full, dropping {func.__name__} for key={key}")
+            return False
+        with self.lock:
+            self.submitted += 1
+        DISPATCHER_QUEUE_DEPTH.set(self.queue_depth(), workspace=self.workspace)
+        return True
+
+    def _worker(self, lane: PriorityLane):
+        while True:
+            entry = lane.get()
+            if entry is None:
+                return
+            priority, (enqueued_at, func, args) = entry
+            wait = time.monotonic() - enqueued_at
+            STAGE_LATENCY.observe(wait, stage="queue_wait", workspace=self.workspace)
+            DISPATCH_WAIT.observe(wait, priority=priority, workspace=self.workspace)
+            DISPATCHER_QUEUE_DEPTH.set(self.queue_depth(), workspace=self.workspace)
+            missed = priority == PAGING and wait > self.paging_slo
+            if missed:
+                DISPATCH_SLO_MISSED.inc(priority=priority, workspace=self.workspace)
+                logger.error(f"Paging event waited {wait:.3f}s in queue, over the {self.paging_slo}s SLO")
+            with self.lock:
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.max_wait_by_priority[priority] = max(self.max_wait_by_priority[priority], wait)
+                self.slo_missed += missed
+            try:
+                func(*args)
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                logger.error(f"Error in dispatcher worker: {e}", exc_info=True)
+            finally:
+                with self.lock:
+                    self.processed += 1
+
+    def queue_depth(self) -> int:
+        return sum(lane.qsize() for lane in self.lanes)
+
+    def stats(self) -> dict:
+        with self.lock:
+            avg_wait = self.total_wait / self.processed if self.processed else 0.0
+            return {
+                "queue_depth": self.queue_depth(),
+                "submitted": self.submitted,
+                "processed": self.processed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "avg_wait": avg_wait,
+                "max_wait": self.max_wait,
+                "paging_max_wait": self.max_wait_by_priority.get(PAGING, 0.0),
+                "slo_missed": self.slo_missed,
+            }
+
+    def shutdown(self, timeout: float = 30.0):
+        """Stops accepting events and waits for queued ones to finish."""
+        if not self.running:
+            return
+        self.running = False
+        logger.info(f"Draining dispatcher, {self.queue_depth()} events in queue")
+        for lane in self.lanes:
+            lane.stop()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        alive = [w.name for w in self.workers if w.is_alive()]
+        if alive:
+            logger.error(f"Dispatcher workers did not finish in {timeout}s: {alive}")
+        else:
+            logger.info("Dispatcher drained")
+        self.workers = []
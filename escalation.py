@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import threading
+import time
+
+from metrics import VOIP_LATENCY
+
+logger = logging.getLogger(__name__)
+
+aiohttp = None
+
+
+def _import_aiohttp():
+    # aiohttp is the slowest import of the process; it is loaded on the
+    # engine's loop thread, so startup does not wait for it
+    global aiohttp
+    if aiohttp is None:
+        import aiohttp as module
+        aiohttp = module
+
+
+class EscalationEngine:
+    """Dials voice targets concurrently from a background asyncio loop.
+
+    Each provider gets its own keep-alive aiohttp session, so repeated pages
+    reuse already open connections instead of doing a new TCP/TLS handshake.
+    `auth` is a (login, password) tuple.
+    """
+
+    def __init__(self, pool_size: int = 10, keepalive_timeout: float = 300.0, workspace: str = "default"):
+        self.pool_size = pool_size
+        self.workspace = workspace
+        self.keepalive_timeout = keepalive_timeout
+        self.sessions = {}
+        self.loop = asyncio.new_event_loop()
+        self.loop.call_soon(_import_aiohttp)
+        self.thread = threading.Thread(target=self.loop.run_forever, name="escalation", daemon=True)
+        self.thread.start()
+
+    def _session(self, provider: str, auth: tuple) -> "aiohttp.ClientSession":
+        session = self.sessions.get(provider)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector, auth=aiohttp.BasicAuth(*auth))
+            self.sessions[provider] = session
+        return session
+
+    async def _dial_one(self, provider: str, session: "aiohttp.ClientSession", target: str, url: str,
+                        timeout: float, ok_status: int, params: dict = None, data: dict = None) -> dict:
+        started = time.monotonic()
+        result = {"target": target, "ok": False, "status": None, "latency": None, "body": None}
+        try:
+            async with session.post(url, params=params, data=data,
+                                    timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                result["status"] = response.status
+                result["latency"] = time.monotonic() - started
+                if response.status == ok_status:
+                    result["ok"] = True
+                    result["body"] = await response.json(content_type=None)
+                else:
+                    result["body"] = await response.text()
+        except asyncio.TimeoutError:
+            result["latency"] = time.monotonic() - started
+            result["body"] = f"Timed out after {timeout}s"
+        except aiohttp.ClientError as e:
+            result["latency"] = time.monotonic() - started
+            result["body"] = str(e)
+        VOIP_LATENCY.observe(result["latency"], provider=provider, outcome="ok" if result["ok"] else "error",
+                             workspace=self.workspace)
+        return result
+
+    async def _dial_all(self, provider: str, auth: tuple, calls: list, timeout: float,
+                        ok_status: int) -> list:
+        session = self._session(provider, auth)
+        return await asyncio.gather(*(
+            self._dial_one(provider, session, call["target"], call["url"], timeout, ok_status,
+                           params=call.get("params"), data=call.get("data"))
+            for call in calls
+        ))
+
+    def dial(self, provider: str, auth: tuple, calls: list, timeout: float,
+             ok_status: int = 200) -> list:
+        """Places all calls at once and waits for every target to answer or time out.
+
+        Each call is a dict with "target", "url" and optional "params"/"data".
+        Returns one result dict per call with its status and time-to-ring latency.
+        """
+        if not calls:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self._dial_all(provider, auth, calls, timeout, ok_status), self.loop)
+        return future.result(timeout + 5)
+
+    async def _probe(self, provider: str, auth: tuple, url: str, timeout: float) -> bool:
+        session = self._session(provider, auth)
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                await response.read()
+                return response.status == 200
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.info(f"Probe of {provider} at {url} failed: {e!r}")
+            return False
+
+    def probe(self, provider: str, auth: tuple, url: str, timeout: float) -> bool:
+        """Health check on the provider's session: True if GET `url` answers 200 within `timeout`."""
+        future = asyncio.run_coroutine_threadsafe(self._probe(provider, auth, url, timeout), self.loop)
+        return future.result(timeout + 5)
+
+    async def _close_sessions(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions = {}
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._close_sessions(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+        self.loop.close()
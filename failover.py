@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+
+from metrics import VOIP_CIRCUIT_OPEN
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures. While open, calls
+    fail fast; after `reset_timeout` seconds one trial call is let through
+    (half open) and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, name: str, failure_threshold: int = 2, reset_timeout: float = 60.0,
+                 workspace: str = "default"):
+        self.name = name
+        self.workspace = workspace
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                logger.info(f"Circuit {self.name} half open, trying one call")
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+        VOIP_CIRCUIT_OPEN.set(0, provider=self.name, workspace=self.workspace)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.error(f"Circuit {self.name} opened after {self.failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            opened = self.state == OPEN
+        if opened:
+            VOIP_CIRCUIT_OPEN.set(1, provider=self.name, workspace=self.workspace)
+
+
+class VoiceRouter:
+    """Places a page through the first healthy voice provider.
+
+    Providers have a `name`, `call()` and `probe()`. The preferred provider is
+    tried first, the others in order if it fails or its circuit is open. A
+    background thread probes every provider each `probe_interval` seconds so
+    a dead host opens its circuit before a page has to wait for it, and a
+    recovered one closes it again.
+    """
+
+    def __init__(self, providers: list, failure_threshold: int = 2, reset_timeout: float = 60.0,
+                 probe_interval: float = 30.0, workspace: str = "default"):
+        self.providers = {provider.name: provider for provider in providers}
+        self.workspace = workspace
+        self.breakers = {
+            provider.name: CircuitBreaker(provider.name, failure_threshold, reset_timeout, workspace)
+            for provider in providers
+        }
+        self.probe_interval = probe_interval
+        self.stopped = threading.Event()
+        self.prober = None
+        self.lock = threading.Lock()
+        self.counters = {"calls": 0, "failovers": 0, "fast_failed": 0, "failed": 0}
+        for name in self.providers:
+            VOIP_CIRCUIT_OPEN.set(0, provider=name, workspace=workspace)
+
+    def start(self):
+        if self.probe_interval and self.prober is None:
+            self.prober = threading.Thread(target=self._probe_loop, name="voip-probe", daemon=True)
+            self.prober.start()
+
+    def _count(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def call(self, preferred: str = None) -> bool:
+        """Pages through `preferred` or fails over to the next healthy provider."""
+        names = list(self.providers)
+        if preferred in self.providers:
+            names.remove(preferred)
+            names.insert(0, preferred)
+        self._count("calls")
+        for index, name in enumerate(names):
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                logger.info(f"Circuit {name} is open, skipping")
+                continue
+            if index:
+                self._count("failovers")
+                logger.info(f"Failing over to {name}")
+            if self.providers[name].call():
+                breaker.record_success()
+                return True
+            breaker.record_failure()
+        if all(breaker.state == OPEN for breaker in self.breakers.values()):
+            self._count("fast_failed")
+        self._count("failed")
+        logger.error(f"No voice provider could place the call, tried {names}")
+        return False
+
+    def probe_all(self):
+        for name, provider in self.providers.items():
+            try:
+                healthy = provider.probe()
+            except Exception as e:
+                logger.error(f"Health probe for {name} failed: {e}")
+                healthy = False
+            if healthy:
+                self.breakers[name].record_success()
+            else:
+                logger.info(f"Health probe for {name} failed")
+                self.breakers[name].record_failure()
+
+    def _probe_loop(self):
+        while not self.stopped.wait(self.probe_interval):
+            self.probe_all()
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        counters.update({f"{name}_circuit": breaker.state for name, breaker in self.breakers.items()})
+        return counters
+
+    def close(self):
+        self.stopped.set()
+        if self.prober:
+            self.prober.join(5)
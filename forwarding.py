@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ForwardBatch:
+    __slots__ = ("key", "ts", "source", "links", "opened", "timer")
+
+    def __init__(self, key: str, ts: str, source: str, link: tuple, opened: float):
+        self.key = key
+        self.ts = ts
+        self.source = source
+        self.links = [link]
+        self.opened = opened
+        self.timer = None
+
+
+class ForwardBatcher:
+    """Groups forwards from one source thread (or one channel, for messages
+    outside threads) into a single digest in target_channel.
+
+    The first forward of a batch is posted right away and places the voice
+    call, if `call` is given; add() returns True then, so a caller that pages
+    on its own can do so. Forwards arriving within `window` seconds are added
+    to the same message with chat_update, at most once per `update_interval`,
+    and do not call again. A batch is closed after `window` seconds or
+    `max_batch` links.
+    """
+
+    def __init__(self, post, update, call=None, window: float = 30.0, max_batch: int = 20,
+                 update_interval: float = 1.0):
+        self.post = post
+        self.update = update
+        self.call = call
+        self.window = window
+        self.max_batch = max_batch
+        self.update_interval = update_interval
+        self.lock = threading.Lock()
+        self.batches = {}
+        # Batches with an update timer pending, including replaced and expired ones
+        self.scheduled = set()
+        self.counters = {"posted": 0, "batched": 0, "updates": 0}
+
+    @staticmethod
+    def batch_key(channel: str, thread_ts: str = None) -> str:
+        return f"{channel}:{thread_ts}" if thread_ts else channel
+
+    @staticmethod
+    def render(source: str, links: list) -> str:
+        """`links` are (permalink, author) pairs, the author names the link when known."""
+        suffix = f" {source}" if source else ""
+        if len(links) == 1:
+            link, author = links[0]
+            sender = f" from {author}" if author else ""
+            return f"@fls_group - You got a <{link}|message>{suffix}{sender}"
+        refs = " ".join(f"<{link}|{author or i}>" for i, (link, author) in enumerate(links, 1))
+        return f"@fls_group - You got {len(links)} messages{suffix}: {refs}"
+
+    def _is_open(self, batch: ForwardBatch, now: float) -> bool:
+        return now - batch.opened < self.window and len(batch.links) < self.max_batch
+
+    def add(self, channel: str, thread_ts: str, link: str, author: str = None, source: str = "") -> bool:
+        """Forwards a message link. Returns True if a new digest was posted."""
+        key = self.batch_key(channel, thread_ts)
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            batch = self.batches.get(key)
+            if batch is not None and self._is_open(batch, now):
+                if any(existing == link for existing, _ in batch.links):
+                    # A replayed outbox entry whose forward already went out
+                    return False
+                batch.links.append((link, author))
+                self.counters["batched"] += 1
+                if batch.timer is None:
+                    batch.timer = threading.Timer(self.update_interval, self._flush, args=(batch,))
+                    batch.timer.daemon = True
+                    batch.timer.start()
+                    self.scheduled.add(batch)
+                logger.info("Forward from %s added to digest, %d messages", key, len(batch.links))
+                return False
+
+        ts = self.post(self.render(source, [(link, author)]))
+        if ts is None:
+            return False
+        with self.lock:
+            # A replaced batch keeps its pending update timer, self.scheduled holds the batch
+            self.batches[key] = ForwardBatch(key, ts, source, (link, author), now)
+            self.counters["posted"] += 1
+        logger.info("Forward from %s posted as a new digest", key)
+        if self.call:
+            self.call()
+        return True
+
+    def _flush(self, batch: ForwardBatch):
+        with self.lock:
+            if batch.timer is None:
+                return
+            batch.timer = None
+            self.scheduled.discard(batch)
+            text = self.render(batch.source, list(batch.links))
+            self.counters["updates"] += 1
+        self.update(batch.ts, text)
+
+    def _expire(self, now: float):
+        # Called with self.lock held
+        for key in [k for k, b in self.batches.items() if now - b.opened >= self.window]:
+            del self.batches[key]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters, open=len(self.batches))
+
+    def close(self):
+        """Cancels pending update timers and sends their updates right away."""
+        with self.lock:
+            pending = list(self.scheduled)
+            for batch in pending:
+                batch.timer.cancel()
+        for batch in pending:
+            self._flush(batch)
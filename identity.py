@@ -0,0 +1,60 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityCache:
+    """The bot's auth_test identity (user id, bot id, workspace url) kept on disk.
+
+    A restart can load rules from the cached identity instead of waiting for
+    auth_test before the socket connects; the caller revalidates it in the
+    background. The file stores a sha256 of the bot token, never the token
+    itself, so an entry written for another token is ignored.
+    """
+
+    def __init__(self, path: str, token: str):
+        self.path = path
+        self.token_hash = hashlib.sha256((token or "").encode()).hexdigest()
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading identity cache {self.path}: {e}")
+            return None
+        if entry.get("token_hash") != self.token_hash or not entry.get("identity", {}).get("id"):
+            return None
+        return entry["identity"]
+
+    def save(self, identity: dict):
+        directory = os.path.dirname(self.path)
+        temporary = f"{self.path}.tmp"
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"token_hash": self.token_hash, "identity": identity}, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.error(f"Error writing identity cache {self.path}: {e}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing identity cache {self.path}: {e}")
+
+
+def create_identity_cache(config):
+    if not config.identity_cache_path:
+        return None
+    return IdentityCache(config.identity_cache_path, config.bot_token)
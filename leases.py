@@ -0,0 +1,63 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseCoordinator:
+    """Lets replicas agree on who executes an action, through a shared sqlite file.
+
+    claim(key) succeeds for the first replica that asks, or for any replica
+    once the lease has expired after `ttl` seconds. The owner that holds a
+    lease can claim it again, so its own outbox replay after a restart still
+    runs. Every replica must have a distinct, stable owner id (REPLICA_ID).
+    """
+
+    def __init__(self, path: str, owner: str, ttl: float = 3600.0, prune_every: int = 1000):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.owner = owner
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+        self.counters = {"claimed": 0, "lost": 0}
+        logger.info(f"Lease coordinator at {path}, owner {owner}")
+
+    def claim(self, key: str) -> bool:
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires < ? OR leases.owner = excluded.owner",
+                (key, self.owner, now + self.ttl, now))
+            claimed = cursor.rowcount == 1
+            self.counters["claimed" if claimed else "lost"] += 1
+            if sum(self.counters.values()) % self.prune_every == 0:
+                self.connection.execute("DELETE FROM leases WHERE expires < ?", (now,))
+        if not claimed:
+            logger.info(f"Lease {key} is held by another replica, skipping")
+        return claimed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def create_lease_coordinator(config):
+    if not config.lease_db_path:
+        return None
+    return LeaseCoordinator(config.lease_db_path, config.replica_id, config.lease_ttl)
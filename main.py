@@ -1,23 +1,68 @@
 import logging
+from config import setup_logging, load_workspaces
+from context import AppContext
 from slack_bot import SlackBot
+from workspaces import WorkspaceRunner
+from backoff import jittered_backoff
+from metrics import start_metrics_server, stop_metrics_server
 import time
 
 logger = logging.getLogger(__name__)
 
 
-def main():
+def restart_delays(context) -> tuple:
+    if context is None:
+        return 1.0, 60.0
+    return context.config.restart_base_delay, context.config.restart_max_delay
+
+
+def run_workspaces(workspaces: dict):
+    runner = WorkspaceRunner(workspaces)
     try:
-        logger.info("Starting Slack Support Bot")
-        bot = SlackBot()
-        bot.start()
+        runner.start()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
-    except Exception as e:
-        logger.error(f"Critical error: {e}", exc_info=True)
-        logger.info("Attempting to restart in 60 seconds...")
-        time.sleep(60)
-        main()
+        runner.stop()
+
+
+def main():
+    workspaces = load_workspaces()
+    if workspaces:
+        run_workspaces(workspaces)
+        return
+    context = None
+    metrics_server = None
+    attempt = 0
+    while True:
+        bot = None
+        started = time.monotonic()
+        try:
+            logger.info("Starting Slack Support Bot")
+            context = context or AppContext()
+            if metrics_server is None and context.config.metrics_port:
+                metrics_server = start_metrics_server(context.config.metrics_port)
+            bot = SlackBot(context)
+            bot.start()
+        except KeyboardInterrupt:
+            logger.info("Bot stopped by user")
+            if bot:
+                bot.stop()
+            if metrics_server:
+                stop_metrics_server(metrics_server)
+            return
+        except Exception as e:
+            logger.error(f"Critical error: {e}", exc_info=True)
+            if bot:
+                bot.close()
+            base_delay, max_delay = restart_delays(context)
+            if time.monotonic() - started > max_delay:
+                attempt = 0
+            delay = jittered_backoff(attempt, base_delay, max_delay)
+            attempt += 1
+            logger.info(f"Attempting to restart in {delay:.1f} seconds...")
+            time.sleep(delay)
 
 
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
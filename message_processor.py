@@ -2,77 +2,106 @@ import re
 import logging
 from typing import Optional
 from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+
+from rules import RuleEngine, Decision
+from permalink import PermalinkResolver
+from metadata import MetadataCache
 
 logger = logging.getLogger(__name__)
 
+ALERT_STATUS_REGEX = re.compile(r'\[(FIRING|RESOLVED)(:\d+)?\]\s*')
+
 
 class MessageProcessor:
     def __init__(self, config):
         self.config = config
+        self.bot_user_id = None
+        self.rules = None
+        self.permalinks = PermalinkResolver(max_entries=self.config.permalink_cache_size)
+        self.metadata = None
 
-    def has_support_tag(self, text: str) -> bool:
-        try:
-            if not text:
-                logger.debug("Message text is empty")
-                return False
-            regex = re.compile(rf'{re.escape(self.config.tag)}', re.IGNORECASE)
-            result = bool(regex.search(text))
-            logger.debug(f"Tag check in text '{text}': {'found' if result else 'not found'}")
-            return result
-        except Exception as e:
-            logger.error(f"Error: {e}")
+    def load_rules(self, bot_user_id: str):
+        self.bot_user_id = bot_user_id
+        self.rules = RuleEngine.from_config(self.config, bot_user_id)
 
-    @staticmethod
-    def is_tagged(text: str, bot_id: str) -> bool:
+    def reload_rules(self, routing=None):
+        self.rules = RuleEngine.from_config(self.config, self.bot_user_id)
+
+    def load_workspace(self, workspace_url: str):
+        self.permalinks = PermalinkResolver(workspace_url, self.config.permalink_cache_size)
+        logger.info(f"Building permalinks locally for workspace {workspace_url}")
+
+    def load_metadata(self, call):
+        self.metadata = MetadataCache(call, self.config.metadata_ttl, self.config.metadata_max_entries)
+        if self.config.metadata_warm:
+            self.metadata.warm_in_background()
+
+    def describe_forward(self, event: dict) -> tuple:
+        """Returns (source, author) for a forward, e.g. ("in #support (VIP)", "Jane").
+
+        Names not cached yet fall back to a <#C…> mention and no author; the
+        cache looks them up in the background.
+        """
+        channel = event.get('channel')
+        if self.metadata is None:
+            return f"in <#{channel}>", None
         try:
-            if not text or not bot_id:
-                logger.debug("Message text or bot_id is empty")
-                return False
-            result = bool(re.search(f'{bot_id}', text))
-            logger.debug(f"Tag check in text '{text}': {'found' if result else 'not found'}")
-            return result
+            name = self.metadata.channel_name(channel)
+            source = f"in #{name}" if name else f"in <#{channel}>"
+            if self.is_vip(channel):
+                source += " (VIP)"
+            return source, self.metadata.user_name(event.get('user'))
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error describing forward from %s: %s", channel, e)
+            return f"in <#{channel}>", None
+
+    def route(self, channel: str, bot_id: str, text: str) -> Decision:
+        return self.rules.evaluate(channel, bot_id, text)
 
     def is_vip(self, channel: str) -> bool:
         try:
-            vip_channels = self.config.vip_channels
-            vip_channels_list = vip_channels.split(',')
-            if channel in vip_channels_list:
-                return True
-            return False
+            return channel in self.config.routing.vip_channel_set
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error: %s", e)
 
     def get_message_link(self, event: dict, client: WebClient) -> Optional[str]:
+        channel = event.get('channel')
+        ts = event.get('ts')
+        logger.debug("Getting permalink for channel=%s, ts=%s", channel, ts)
+        permalink = self.permalinks.resolve(event, client)
+        if permalink:
+            logger.info("Retrieved permalink: %s", permalink)
+        return permalink
+
+    def is_dev_call(self, event: dict, channel: str, bot_id: str, verbose: bool = True) -> bool:
         try:
-            channel = event.get('channel')
-            ts = event.get('ts')
-            logger.debug(f"Getting permalink for channel={channel}, ts={ts}")
-            result = client.chat_getPermalink(channel=channel, message_ts=ts)
-            logger.info(f"Retrieved permalink: {result['permalink']}")
-            return result['permalink']
-        except SlackApiError as e:
-            logger.error(f"Error getting permalink: {e.response['error']}")
-            return None
-
-    def is_dev_call(self, event: dict, channel: str, bot_id: str) -> bool:
-        try:
-            logger.info("Checking if this is dev_call")
             if channel == self.config.twilio_channel and bot_id == self.config.twilio_bot:
                 attachments = event.get("attachments", [])
-                for i, attachment in enumerate(attachments):
+                logger.info("Checking dev_call attachments - %s, %s", bot_id, channel)
+                for attachment in attachments:
                     fallback = attachment.get("fallback", "")
                     text = attachment.get("text", "")
-                    logger.info(f"This is dev_call - {bot_id}, {channel}")
                     if "FIRING" in fallback and "call_voip = true" in text:
-                        logger.info(f"Includes call_voip pattern in text {fallback} - {text}")
-                        logger.debug(event)
+                        logger.info("Includes call_voip pattern in text %s - %s", fallback, text)
+                        if verbose:
+                            logger.debug("Dev call event: %s", event)
                         return True
-            logger.info(f"Not dev_call - {bot_id} - {channel}")
-            logger.debug(event)
+            logger.debug("Not dev_call - %s - %s", bot_id, channel)
             return False
         except Exception as e:
-            logger.error(f"Error in is_dev_call: {e}")
+            logger.error("Error in is_dev_call: %s", e)
+            return False
+
+    @staticmethod
+    def alert_fingerprint(event: dict) -> str:
+        """Alert identity shared by its FIRING and RESOLVED notifications."""
+        for attachment in event.get("attachments", []):
+            title = attachment.get("title") or attachment.get("fallback", "")
+            if title:
+                return ALERT_STATUS_REGEX.sub('', title).strip()
+        return event.get("ts", "unknown")
+
+    def is_dev_call_resolved(self, event: dict, channel: str, bot_id: str) -> bool:
+        if channel != self.config.twilio_channel or bot_id != self.config.twilio_bot:
             return False
+        return any("RESOLVED" in attachment.get("fallback", "") for attachment in event.get("attachments", []))
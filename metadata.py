@@ -0,0 +1,203 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+
+class NameRecord:
+    __slots__ = ("name", "expires")
+
+    def __init__(self, name: str, expires: float):
+        self.name = name
+        self.expires = expires
+
+
+def user_display_name(user: dict) -> str:
+    profile = user.get("profile", {})
+    return profile.get("display_name") or profile.get("real_name") or user.get("real_name") or user.get("name", "")
+
+
+class MetadataCache:
+    """Channel and user names kept in process, so forwards can say where a
+    message came from without a Web API call per message.
+
+    warm() pages through conversations_list and users_list once at startup;
+    channel_rename/user_change events update entries in place. Entries
+    expire after `ttl` seconds and the least recently used ones are evicted
+    above `max_entries` per kind. A miss returns None at once and queues a
+    conversations_info or users_info lookup on a background thread, so a
+    forward never waits for the Web API or its rate limits; the forward goes
+    out with a bare mention and later ones get the name. A failed lookup is
+    cached as an empty name so it is not retried for every message.
+    `call(method, **kwargs)` is Broadcaster.call, so every request goes
+    through the rate limit buckets.
+    """
+
+    def __init__(self, call, ttl: float = 21600.0, max_entries: int = 20000):
+        self.call = call
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.channels = OrderedDict()
+        self.users = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.fetches = queue.Queue()
+        self.queued = set()
+        self.fetcher = None
+        self.closed = False
+
+    def _put(self, table: OrderedDict, key: str, record):
+        # Called with self.lock held
+        table[key] = record
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def _get(self, table: OrderedDict, key: str):
+        with self.lock:
+            record = table.get(key)
+            if record is not None and record.expires > time.monotonic():
+                table.move_to_end(key)
+                self.hits += 1
+                return record
+            self.misses += 1
+            return None
+
+    def _paginate(self, method: str, field: str, **kwargs) -> int:
+        count = 0
+        cursor = None
+        while True:
+            response = self.call(method, limit=1000, cursor=cursor, **kwargs)
+            items = response.get(field, [])
+            expires = time.monotonic() + self.ttl
+            with self.lock:
+                self.api_calls += 1
+                for item in items:
+                    if field == "channels":
+                        self._put(self.channels, item["id"], NameRecord(item.get("name", ""), expires))
+                    else:
+                        self._put(self.users, item["id"], NameRecord(user_display_name(item), expires))
+            count += len(items)
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return count
+
+    def warm(self):
+        started = time.monotonic()
+        try:
+            channels = self._paginate("conversations_list", "channels", exclude_archived=True,
+                                      types="public_channel,private_channel")
+            users = self._paginate("users_list", "members")
+            logger.info(f"Metadata cache warmed with {channels} channels and {users} users "
+                        f"in {time.monotonic() - started:.1f}s")
+        except SlackApiError as e:
+            logger.error(f"Error warming metadata cache: {e.response['error']}")
+        except Exception as e:
+            logger.error(f"Error warming metadata cache: {e}")
+
+    def warm_in_background(self):
+        threading.Thread(target=self.warm, name="metadata-warm", daemon=True).start()
+
+    def channel_name(self, channel: str) -> Optional[str]:
+        if not channel:
+            return None
+        record = self._get(self.channels, channel)
+        if record is None:
+            self._fetch_later("channel", channel)
+            return None
+        return record.name or None
+
+    def user_name(self, user: str) -> Optional[str]:
+        if not user:
+            return None
+        record = self._get(self.users, user)
+        if record is None:
+            self._fetch_later("user", user)
+            return None
+        return record.name or None
+
+    def _fetch_later(self, kind: str, key: str):
+        with self.lock:
+            if self.closed or (kind, key) in self.queued:
+                return
+            self.queued.add((kind, key))
+            if self.fetcher is None:
+                self.fetcher = threading.Thread(target=self._fetch_loop, name="metadata-fetch", daemon=True)
+                self.fetcher.start()
+        self.fetches.put((kind, key))
+
+    def _fetch_loop(self):
+        while True:
+            item = self.fetches.get()
+            try:
+                if item is None:
+                    return
+                self._fetch(*item)
+            finally:
+                if item is not None:
+                    with self.lock:
+                        self.queued.discard(item)
+                self.fetches.task_done()
+
+    def _fetch(self, kind: str, key: str):
+        name = ""
+        try:
+            if kind == "channel":
+                name = self.call("conversations_info", channel=key)["channel"].get("name", "")
+            else:
+                name = user_display_name(self.call("users_info", user=key)["user"])
+        except SlackApiError as e:
+            logger.error(f"Error getting {kind} info for {key}: {e.response['error']}")
+        except Exception as e:
+            # Timeouts and connection errors are not cached, the next forward queues the lookup again
+            logger.error(f"Error getting {kind} info for {key}: {e}")
+            return
+        with self.lock:
+            self.api_calls += 1
+            self._put(self.channels if kind == "channel" else self.users, key,
+                      NameRecord(name, time.monotonic() + self.ttl))
+
+    def wait_fetched(self):
+        """Blocks until every queued lookup is done."""
+        self.fetches.join()
+
+    def on_event(self, event: dict):
+        """Applies channel_rename and user_change events to the cache."""
+        expires = time.monotonic() + self.ttl
+        event_type = event.get("type")
+        with self.lock:
+            if event_type == "channel_rename":
+                channel = event.get("channel", {})
+                self._put(self.channels, channel.get("id"), NameRecord(channel.get("name", ""), expires))
+                logger.info(f"Channel {channel.get('id')} renamed to {channel.get('name')}")
+            elif event_type == "user_change":
+                user = event.get("user", {})
+                self._put(self.users, user.get("id"), NameRecord(user_display_name(user), expires))
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "channels": len(self.channels),
+                "users": len(self.users),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "api_calls": self.api_calls,
+                "queued": len(self.queued),
+            }
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            fetcher = self.fetcher
+        if fetcher:
+            self.fetches.put(None)
+            fetcher.join(5)
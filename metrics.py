@@ -0,0 +1,204 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> list:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list:
+        with self.lock:
+            return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> list:
+        lines = []
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.label_names, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+ACK_LATENCY = REGISTRY.histogram(
+    "slack_bot_ack_latency_seconds", "Time from receiving an envelope to acking it", ("type", "workspace"))
+STAGE_LATENCY = REGISTRY.histogram(
+    "slack_bot_stage_latency_seconds", "Time spent in each event handling stage", ("stage", "workspace"))
+WEB_API_LATENCY = REGISTRY.histogram(
+    "slack_bot_web_api_latency_seconds", "Slack Web API call latency", ("method", "outcome", "workspace"))
+WEB_API_COALESCED = REGISTRY.counter(
+    "slack_bot_web_api_coalesced_total", "Web API calls answered by an identical call already in flight",
+    ("method", "workspace"))
+VOIP_LATENCY = REGISTRY.histogram(
+    "slack_bot_voip_call_latency_seconds", "Time until a voice provider accepted a call",
+    ("provider", "outcome", "workspace"))
+EVENTS_SKIPPED = REGISTRY.counter(
+    "slack_bot_events_skipped_total", "Events dropped before processing", ("reason", "workspace"))
+EVENTS_DISPATCHED = REGISTRY.counter(
+    "slack_bot_events_dispatched_total", "Events handed to the dispatcher", ("kind", "workspace"))
+DISPATCHER_QUEUE_DEPTH = REGISTRY.gauge(
+    "slack_bot_dispatcher_queue_depth", "Events waiting in the dispatcher queues", ("workspace",))
+DISPATCH_WAIT = REGISTRY.histogram(
+    "slack_bot_dispatch_wait_seconds", "Time an action waited in the dispatcher, by priority class",
+    ("priority", "workspace"),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0))
+DISPATCH_SLO_MISSED = REGISTRY.counter(
+    "slack_bot_dispatch_slo_missed_total", "Paging actions that waited longer than PAGING_SLO_SECONDS",
+    ("priority", "workspace"))
+VOIP_CIRCUIT_OPEN = REGISTRY.gauge(
+    "slack_bot_voip_circuit_open", "1 while the circuit breaker of a voice provider is open",
+    ("provider", "workspace"))
+SOCKET_CONNECTED = REGISTRY.gauge(
+    "slack_bot_socket_connected", "Number of open Socket Mode connections", ("workspace",))
+SOCKET_RECONNECTS = REGISTRY.gauge(
+    "slack_bot_socket_reconnects", "Socket Mode reconnects since start", ("workspace",))
+SOCKET_RECOVERY = REGISTRY.histogram(
+    "slack_bot_socket_recovery_seconds", "Time from detecting a lost connection to reconnecting",
+    ("workspace",))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request: {format % args}")
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    logger.info(f"Metrics available on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def stop_metrics_server(server: ThreadingHTTPServer):
+    """Stops serving and releases the port, so a new server can bind it."""
+    server.shutdown()
+    server.server_close()
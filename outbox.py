@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SYNC_MODES = {"off": "OFF", "normal": "NORMAL", "full": "FULL"}
+
+
+class OutboxEntry:
+    __slots__ = ("id", "key", "action", "payload", "attempts")
+
+    def __init__(self, id: int, key: str, action: str, payload: dict, attempts: int = 0):
+        self.id = id
+        self.key = key
+        self.action = action
+        self.payload = payload
+        self.attempts = attempts
+
+
+class Outbox:
+    """Append-only sqlite (WAL) log of actions that still have to be executed.
+
+    Every classified action is appended before it runs and marked done after,
+    so an action acked to Slack but interrupted by a crash is replayed on the
+    next start (at-least-once). The idempotency key drops duplicate appends.
+
+    Commits are grouped: every write waits until its row is committed. A
+    writer commits right away unless other writers are already queued for
+    the lock, in which case the last of them commits for all, up to
+    `batch_size` rows per commit. `batch_interval` bounds how long a row can
+    stay uncommitted. `sync` is the sqlite synchronous mode, i.e. how often
+    the WAL is fsynced.
+    """
+
+    def __init__(self, path: str, sync: str = "normal", batch_size: int = 1, batch_interval: float = 0.001,
+                 max_attempts: int = 5, retention: float = 86400.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={SYNC_MODES.get(sync, 'NORMAL')}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE NOT NULL, action TEXT NOT NULL, "
+            "payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "created REAL NOT NULL, updated REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, id)")
+        self.lock = threading.Condition()
+        self.arrival_lock = threading.Lock()
+        self.arriving = 0
+        self.in_transaction = False
+        self.uncommitted = 0
+        self.written_seq = 0
+        self.committed_seq = 0
+        self.closed = False
+        self.flusher = None
+        if self.batch_size > 1:
+            self.flusher = threading.Thread(target=self._flush_loop, name="outbox-flush", daemon=True)
+            self.flusher.start()
+        logger.info(f"Outbox opened at {path} (synchronous={sync}, batch_size={self.batch_size})")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        # Called with self.lock held
+        if not self.in_transaction:
+            self.connection.execute("BEGIN")
+            self.in_transaction = True
+        cursor = self.connection.execute(sql, params)
+        self.uncommitted += 1
+        self.written_seq += 1
+        return cursor
+
+    def _commit(self):
+        # Called with self.lock held
+        if self.in_transaction:
+            self.connection.execute("COMMIT")
+            self.in_transaction = False
+        self.uncommitted = 0
+        self.committed_seq = self.written_seq
+        self.lock.notify_all()
+
+    def _wait_committed(self, seq: int):
+        # Called with self.lock held
+        if self.batch_size == 1 or self.uncommitted >= self.batch_size or not self.arriving:
+            self._commit()
+            return
+        self.lock.notify_all()
+        while self.committed_seq < seq and not self.closed:
+            self.lock.wait()
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        """Executes one write and waits for its commit."""
+        with self.arrival_lock:
+            self.arriving += 1
+        with self.lock:
+            with self.arrival_lock:
+                self.arriving -= 1
+            cursor = self._execute(sql, params)
+            self._wait_committed(self.written_seq)
+        return cursor
+
+    def _flush_loop(self):
+        with self.lock:
+            while not self.closed:
+                if self.uncommitted:
+                    self.lock.wait(self.batch_interval)
+                    if self.uncommitted:
+                        self._commit()
+                else:
+                    self.lock.wait()
+
+    def append(self, key: str, action: str, payload: dict):
+        """Durably records an action. Returns its OutboxEntry, or None for a duplicate key."""
+        now = time.time()
+        cursor = self._write(
+            "INSERT OR IGNORE INTO outbox (key, action, payload, created, updated) VALUES (?, ?, ?, ?, ?)",
+            (key, action, json.dumps(payload), now, now))
+        entry_id = cursor.lastrowid if cursor.rowcount else None
+        if entry_id is None:
+            logger.info(f"Outbox entry {key} already exists, skipping")
+            return None
+        return OutboxEntry(entry_id, key, action, payload)
+
+    def complete(self, entry: OutboxEntry):
+        self._write("UPDATE outbox SET status = 'done', updated = ? WHERE id = ?", (time.time(), entry.id))
+
+    def fail(self, entry: OutboxEntry):
+        entry.attempts += 1
+        status = "failed" if entry.attempts >= self.max_attempts else "pending"
+        self._write("UPDATE outbox SET status = ?, attempts = ?, updated = ? WHERE id = ?",
+                    (status, entry.attempts, time.time(), entry.id))
+        if status == "failed":
+            logger.error(f"Outbox entry {entry.key} failed {entry.attempts} times, giving up")
+
+    def pending(self) -> list:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, key, action, payload, attempts FROM outbox WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        return [OutboxEntry(row[0], row[1], row[2], json.loads(row[3]), row[4]) for row in rows]
+
+    def prune(self):
+        with self.lock:
+            self._execute("DELETE FROM outbox WHERE status != 'pending' AND updated < ?",
+                          (time.time() - self.retention,))
+            self._commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.closed = True
+            self.lock.notify_all()
+        if self.flusher:
+            self.flusher.join(1)
+        self.connection.close()
+
+
+def create_outbox(config):
+    if not config.outbox_path:
+        return None
+    return Outbox(
+        config.outbox_path,
+        sync=config.outbox_sync,
+        batch_size=config.outbox_batch_size,
+        batch_interval=config.outbox_batch_interval,
+        max_attempts=config.outbox_max_attempts
+    )
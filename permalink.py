@@ -0,0 +1,69 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+
+class PermalinkResolver:
+    """Builds message permalinks locally and caches them per (channel, ts).
+
+    Top-level messages get a link built from the workspace url returned by
+    auth_test. Thread replies and anything we can't build locally fall back
+    to chat_getPermalink.
+    """
+
+    def __init__(self, workspace_url: str = None, max_entries: int = 1000):
+        self.workspace_url = workspace_url.rstrip('/') if workspace_url else None
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.built = 0
+        self.api_calls = 0
+
+    def build(self, channel: str, ts: str) -> Optional[str]:
+        if not self.workspace_url or not channel or not ts or '.' not in ts:
+            return None
+        return f"{self.workspace_url}/archives/{channel}/p{ts.replace('.', '')}"
+
+    def resolve(self, event: dict, client: WebClient) -> Optional[str]:
+        channel = event.get('channel')
+        ts = event.get('ts')
+        key = (channel, ts)
+        with self.lock:
+            permalink = self.cache.get(key)
+            if permalink:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return permalink
+
+        thread_ts = event.get('thread_ts')
+        permalink = None
+        if not thread_ts or thread_ts == ts:
+            permalink = self.build(channel, ts)
+            if permalink:
+                self.built += 1
+        if not permalink:
+            logger.debug("Getting permalink from API for channel=%s, ts=%s", channel, ts)
+            try:
+                result = client.chat_getPermalink(channel=channel, message_ts=ts)
+                permalink = result['permalink']
+                self.api_calls += 1
+            except SlackApiError as e:
+                logger.error("Error getting permalink: %s", e.response['error'])
+                return None
+
+        with self.lock:
+            self.cache[key] = permalink
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        return permalink
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"size": len(self.cache), "hits": self.hits, "built": self.built, "api_calls": self.api_calls}
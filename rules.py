@@ -0,0 +1,143 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+FORWARD = "forward"
+CALL = "call"
+IGNORE = "ignore"
+ACTIONS = (FORWARD, CALL, IGNORE)
+
+DEFAULT_ROUTING_RULES = {
+    "bot_channels": ["C02T9LSBB0W", "C08U53E0ECD"],
+    "bot_ids": [],
+    "rules": [
+        {
+            "name": "dead_heat_resulted_market",
+            "action": IGNORE,
+            "channels": ["C09BD8TMDED"],
+            "contains": ["Dead heat resulted market"],
+        },
+    ],
+}
+
+
+class Rule:
+    __slots__ = ("name", "action", "channels", "bots", "pattern_ids")
+
+    def __init__(self, name: str, action: str, channels: frozenset, bots: frozenset, pattern_ids: frozenset):
+        self.name = name
+        self.action = action
+        self.channels = channels
+        self.bots = bots
+        self.pattern_ids = pattern_ids
+
+    def matches(self, channel: str, bot_id: str, found: set) -> bool:
+        if self.channels and channel not in self.channels:
+            return False
+        if self.bots and bot_id not in self.bots:
+            return False
+        if self.pattern_ids and not (self.pattern_ids & found):
+            return False
+        return True
+
+
+class Decision:
+    __slots__ = ("actions", "ignored_by")
+
+    def __init__(self, actions: list, ignored_by: str = None):
+        self.actions = actions
+        self.ignored_by = ignored_by
+
+    @property
+    def ignore(self) -> bool:
+        return self.ignored_by is not None
+
+
+class RuleEngine:
+    """Routing table compiled once into frozensets and a single text matcher.
+
+    Substring patterns are checked with plain `in` lookups (the text is
+    lowercased at most once for case-insensitive ones), which is much faster
+    in CPython than a regex alternation of literals. Regex patterns are
+    joined into one alternation with a named group per pattern. Rules are
+    evaluated in order; an "ignore" rule wins over everything else.
+    """
+
+    def __init__(self, rules: list, bot_channels=(), bot_ids=()):
+        self.bot_channels = frozenset(bot_channels)
+        self.bot_ids = frozenset(bot_ids)
+        self.rules = []
+        self.literals = []
+        patterns = []
+        pattern_count = 0
+        for spec in rules:
+            action = spec.get("action")
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown action {action!r} in routing rule {spec.get('name')}")
+            ignore_case = spec.get("ignore_case", False)
+            pattern_ids = set()
+            for needle in spec.get("contains", []):
+                if needle:
+                    pattern_ids.add(pattern_count)
+                    self.literals.append((pattern_count, needle.lower() if ignore_case else needle, ignore_case))
+                    pattern_count += 1
+            for source in spec.get("regex", []):
+                if source:
+                    pattern_ids.add(pattern_count)
+                    patterns.append(f"(?P<p{pattern_count}>{f'(?i:{source})' if ignore_case else source})")
+                    pattern_count += 1
+            if (spec.get("contains") or spec.get("regex")) and not pattern_ids:
+                # A rule with only empty patterns would otherwise match every message
+                logger.error(f"Routing rule {spec.get('name')} has only empty patterns, skipping")
+                continue
+            self.rules.append(Rule(
+                name=spec.get("name", action),
+                action=action,
+                channels=frozenset(c for c in spec.get("channels", []) if c),
+                bots=frozenset(spec.get("bots", [])),
+                pattern_ids=frozenset(pattern_ids),
+            ))
+        self.matcher = re.compile("|".join(patterns)) if patterns else None
+        logger.info(f"Compiled {len(self.rules)} routing rules with {pattern_count} text patterns")
+
+    @classmethod
+    def from_config(cls, config, bot_user_id: str) -> "RuleEngine":
+        routing = {**DEFAULT_ROUTING_RULES, **config.routing_rules}
+        rules = list(routing.get("rules", []))
+        rules.append({"name": "support_tag", "action": FORWARD, "contains": [config.tag], "ignore_case": True})
+        if bot_user_id:
+            rules.append({"name": "bot_mention", "action": FORWARD, "contains": [bot_user_id]})
+        if config.vip_channels:
+            rules.append({"name": "vip_channel", "action": CALL, "channels": config.vip_channels.split(',')})
+        return cls(rules, routing.get("bot_channels", []), routing.get("bot_ids", []))
+
+    def scan(self, text: str) -> set:
+        found = set()
+        if not text:
+            return found
+        lowered = None
+        for pattern_id, needle, ignore_case in self.literals:
+            if ignore_case:
+                if lowered is None:
+                    lowered = text.lower()
+                if needle in lowered:
+                    found.add(pattern_id)
+            elif needle in text:
+                found.add(pattern_id)
+        if self.matcher is not None:
+            found.update(int(match.lastgroup[1:]) for match in self.matcher.finditer(text))
+        return found
+
+    def bot_allowed(self, channel: str, bot_id: str) -> bool:
+        return channel in self.bot_channels or bot_id in self.bot_ids
+
+    def evaluate(self, channel: str, bot_id: str, text: str) -> Decision:
+        found = self.scan(text)
+        actions = []
+        for rule in self.rules:
+            if rule.matches(channel, bot_id, found):
+                if rule.action == IGNORE:
+                    return Decision([], ignored_by=rule.name)
+                actions.append((rule.name, rule.action))
+        return Decision(actions)
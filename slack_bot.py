@@ -1,166 +1,550 @@
 import os
+import asyncio
+import functools
+import signal
+import threading
 import time
 import logging
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 
 from voip import AsteriskVOIP
 from voip_twilio import TwilioVOIP
-from config import SlackBotConfig
+from config import PayloadSampler
+from context import AppContext
 from message_processor import MessageProcessor
 from commands_handler import CommandHandler
+from dispatcher import EventDispatcher, PAGING, ROUTINE
+from dedup import create_dedup_store, make_dedup_key
+from outbox import OutboxEntry, create_outbox
+from leases import create_lease_coordinator
+from identity import create_identity_cache
+from catchup import CatchUp
+from rules import FORWARD, CALL
+from alerts import DevCallCoalescer, FAILED
+from forwarding import ForwardBatcher
+from failover import VoiceRouter
+from backoff import jittered_backoff
+from metrics import (ACK_LATENCY, STAGE_LATENCY, EVENTS_SKIPPED, EVENTS_DISPATCHED, SOCKET_CONNECTED,
+                     SOCKET_RECONNECTS)
 
 logger = logging.getLogger(__name__)
 
+METADATA_EVENTS = ("channel_rename", "user_change")
+
 
 class SlackBot:
-    def __init__(self):
-        self.config = SlackBotConfig()
+    def __init__(self, context: AppContext = None):
+        self.context = context or AppContext()
+        self.config = self.context.config
+        self.workspace = self.config.workspace or "default"
         self.start_time = time.time()
-        self.processed_messages = set()
-        self.voip = AsteriskVOIP()
-        try:
-            self.web_client = WebClient(token=self.config.bot_token)
-            logger.info("WebClient initialized")
-        except Exception as e:
-            logger.error(f"Error initializing WebClient: {e}")
-            raise
+        self.processed_messages = create_dedup_store(self.config)
+        self.escalation = self.context.escalation
+        self.web_client = self.context.web_client
+        self.voip = AsteriskVOIP(self.config, self.escalation)
 
         self.socket_client = SocketModeClient(
             app_token=self.config.app_token,
-            web_client=self.web_client
+            web_client=self.web_client,
+            on_close_listeners=[self.on_socket_close]
         )
         self.processor = MessageProcessor(self.config)
-        self.twilio_voip = TwilioVOIP(self.config)
-        bot_info = self.get_bot_info()
-        self.bot_user_id = bot_info['id']
-        self.bot_id = bot_info.get('bot_id', '')
+        self.payload_sampler = PayloadSampler(self.config.log_payload_sample_rate)
+        self.broadcaster = self.context.broadcaster
+        self.command_handler = CommandHandler(self.web_client, self.config, self.broadcaster)
+        self.twilio_voip = TwilioVOIP(self.config, self.escalation)
+        self.identity = create_identity_cache(self.config)
+        cached_info = self.identity.load() if self.identity else None
+        bot_info = cached_info or self.get_bot_info()
+        if bot_info and self.identity and not cached_info:
+            self.identity.save(bot_info)
+        self.apply_identity(bot_info)
+        self.processor.load_metadata(self.broadcaster.call)
+        self.context.on_reload(self.processor.reload_rules)
+        if cached_info:
+            logger.info(f"Bot: {cached_info.get('name')} (User ID: {cached_info['id']}) from identity cache, "
+                        f"revalidating in background")
+            threading.Thread(target=self.revalidate_identity, args=(cached_info,), name="identity",
+                             daemon=True).start()
+        self.async_runtime = None
+        self.stopped = threading.Event()
+        self.voice = VoiceRouter(
+            [self.voip, self.twilio_voip],
+            failure_threshold=self.config.voip_failure_threshold,
+            reset_timeout=self.config.voip_reset_timeout,
+            probe_interval=self.config.voip_probe_interval,
+            workspace=self.workspace
+        )
+        self.dev_calls = DevCallCoalescer(
+            functools.partial(self.voice.call, AsteriskVOIP.name),
+            functools.partial(self.voice.call, TwilioVOIP.name),
+            window=self.config.dev_call_window,
+            twilio_delay=self.config.dev_call_twilio_delay,
+            max_live_calls=self.config.dev_call_max_live
+        )
+        self.forwards = ForwardBatcher(
+            self.post_forward,
+            self.update_forward,
+            window=self.config.forward_batch_window,
+            max_batch=self.config.forward_batch_max
+        )
+        self.outbox = create_outbox(self.config)
+        self.leases = create_lease_coordinator(self.config)
+        self.inflight = set()
+        self.inflight_lock = threading.Lock()
+        self.catchup = CatchUp(
+            self.broadcaster.call,
+            self.ingest_history,
+            self.watched_channels,
+            window=self.config.catchup_window,
+            max_pages=self.config.catchup_max_pages,
+            page_size=self.config.catchup_page_size,
+            rate=self.config.catchup_rate
+        )
+        self.dispatcher = EventDispatcher(
+            workers=self.config.dispatcher_workers,
+            max_queue_size=self.config.dispatcher_queue_size,
+            weights={PAGING: self.config.dispatcher_paging_weight, ROUTINE: 1},
+            paging_slo=self.config.paging_slo,
+            workspace=self.workspace
+        )
 
     def get_bot_info(self) -> dict:
         try:
             response = self.web_client.auth_test()
             bot_id = response['user_id']
             bot_name = response['user']
-            bot_info = {'name': bot_name, 'id': bot_id, 'bot_id': response.get('bot_id', '')}
+            bot_info = {'name': bot_name, 'id': bot_id, 'bot_id': response.get('bot_id', ''),
+                        'url': response.get('url')}
             logger.info(f"Bot: {bot_name} (User ID: {bot_id}, Bot ID: {bot_info['bot_id']})")
             return bot_info
         except SlackApiError as e:
             logger.error(f"Error getting bot info: {e.response['error']}")
             return {}
 
+    def apply_identity(self, bot_info: dict):
+        self.bot_user_id = bot_info['id']
+        self.bot_id = bot_info.get('bot_id', '')
+        self.processor.load_rules(self.bot_user_id)
+        self.processor.load_workspace(bot_info.get('url'))
+
+    def revalidate_identity(self, cached_info: dict):
+        """Confirms the cached identity with auth_test; reloads rules if the token now belongs to another bot."""
+        try:
+            bot_info = self.get_bot_info()
+        except Exception as e:
+            logger.error(f"Error revalidating bot identity: {e}")
+            return
+        if not bot_info:
+            logger.error("Could not revalidate bot identity, dropping identity cache")
+            self.identity.clear()
+            return
+        if bot_info != cached_info:
+            logger.info(f"Bot identity changed from {cached_info.get('id')} to {bot_info['id']}, reloading rules")
+            self.apply_identity(bot_info)
+        self.identity.save(bot_info)
+
     def handle_message(self, client: SocketModeClient, req: SocketModeRequest):
+        received = time.perf_counter()
         client.send_socket_mode_response({"envelope_id": req.envelope_id})
+        ACK_LATENCY.observe(time.perf_counter() - received, type=req.type, workspace=self.workspace)
         if req.type == "events_api":
-            logger.info(
-                f"Request received: {req.type}, payload: {req.payload if self.config.debug_mode else 'DEBUG_MODE = FALSE'}")
-            event = req.payload.get('event', {})
-            logger.debug(f"Full event: {event}")
-            event_type = event.get('type')
-            subtype = event.get('subtype')
-            channel = event.get('channel', 'unknown')
-            user = event.get('user', 'unknown')
-            bot_id = event.get('bot_id', 'unknown')
-            ts = event.get('ts', '0')
-            text = event.get('text', '')
-
-            allowed_bot_channels = ['C02T9LSBB0W', 'C08U53E0ECD']
-
-            if self.processor.is_dev_call(event, channel, bot_id):
-                logger.info(f"Dev call detected for channel={channel}, bot_id={bot_id}")
-                self.twilio_voip.call_twilio()
-                self.voip.quick_call()
-
-            if event_type != 'message':
-                logger.info(f"Skipping event: event_type={event_type} is not 'message'")
-                return
+            with STAGE_LATENCY.time(stage="classify", workspace=self.workspace):
+                self.classify_event(req)
 
-            if user == self.bot_user_id:
-                logger.info(f"Skipping message from bot itself: user={user}")
-                return
+    def classify_event(self, req: SocketModeRequest):
+        event = req.payload.get('event', {})
+        verbose = logger.isEnabledFor(logging.DEBUG) and self.payload_sampler.sample()
+        if verbose and self.config.debug_mode:
+            logger.debug("Request received: %s, payload: %s", req.type, req.payload)
+        else:
+            logger.info("Request received: %s, event_id: %s", req.type, req.payload.get('event_id'),
+                        extra={"fields": {"event_id": req.payload.get('event_id'), "request_type": req.type}})
+        if verbose:
+            logger.debug("Full event: %s", event)
+        channel = event.get('channel')
+        if self.catchup.holding(channel) and not self.is_paging(event) and \
+                self.catchup.hold(channel, self.classify, event, req.payload.get('event_id'), verbose):
+            logger.info("Holding event of channel %s until its catch-up is done", channel)
+            return
+        self.classify(event, req.payload.get('event_id'), verbose)
 
-            if channel == "C09BD8TMDED" and "Dead heat resulted market" in text:
-                logger.info("Found 'Dead heat resulted market' in text. Ignoring")
-                return
+    def is_paging(self, event: dict) -> bool:
+        """True if the event would place a call; such events are never held back by the catch-up."""
+        channel = event.get('channel')
+        bot_id = event.get('bot_id', 'unknown')
+        if self.processor.is_dev_call(event, channel, bot_id, False):
+            return True
+        decision = self.processor.route(channel, bot_id, event.get('text', ''))
+        return not decision.ignore and any(action == CALL for _, action in decision.actions)
 
-            if subtype == "bot_message" and channel not in allowed_bot_channels:
-                logger.info(f"Skipping bot message from disallowed channel={channel}")
-                return
+    def ingest_history(self, message: dict):
+        """Classifies a message fetched by the reconnect catch-up like a live event."""
+        self.classify(message, None, False)
 
-            if subtype and subtype != "bot_message":
-                logger.info(f"Skipping message with unsupported subtype={subtype}")
-                return
+    def classify(self, event: dict, event_id: str = None, verbose: bool = False):
+        event_type = event.get('type')
+        subtype = event.get('subtype')
+        channel = event.get('channel', 'unknown')
+        user = event.get('user', 'unknown')
+        bot_id = event.get('bot_id', 'unknown')
+        ts = event.get('ts', '0')
+        text = event.get('text', '')
+
+        if event_type == 'reaction_added':
+            item = event.get('item', {})
+            if item.get('channel') == self.config.twilio_channel:
+                self.dev_calls.ack(ts=item.get('ts'))
+
+        if self.processor.is_dev_call(event, channel, bot_id, verbose):
+            logger.info("Dev call detected for channel=%s, bot_id=%s", channel, bot_id)
+            self.submit_action(channel, "dev_call", f"dev_call:{channel}:{ts}", {"event": event})
+            EVENTS_DISPATCHED.inc(kind="dev_call", workspace=self.workspace)
+        elif self.processor.is_dev_call_resolved(event, channel, bot_id):
+            self.dev_calls.ack(self.processor.alert_fingerprint(event))
+
+        if event_type in METADATA_EVENTS:
+            self.processor.metadata.on_event(event)
+
+        if event_type != 'message':
+            logger.info("Skipping event: event_type=%s is not 'message'", event_type)
+            EVENTS_SKIPPED.inc(reason="event_type", workspace=self.workspace)
+            return
+
+        try:
+            message_ts = float(ts)
+        except ValueError:
+            logger.error("Invalid timestamp: %s", ts)
+            EVENTS_SKIPPED.inc(reason="invalid_ts", workspace=self.workspace)
+            return
+        if message_ts < self.start_time:
+            logger.info("Ignoring old message: ts=%s, start_time=%s", message_ts, self.start_time)
+            EVENTS_SKIPPED.inc(reason="old_message", workspace=self.workspace)
+            return
+        if self.is_watched(channel):
+            self.catchup.advance(channel, message_ts)
+
+        if user == self.bot_user_id:
+            logger.info("Skipping message from bot itself: user=%s", user)
+            EVENTS_SKIPPED.inc(reason="bot_self", workspace=self.workspace)
+            return
+
+        decision = self.processor.route(channel, bot_id, text)
+        if decision.ignore:
+            logger.info("Message matched ignore rule %s. Ignoring", decision.ignored_by)
+            EVENTS_SKIPPED.inc(reason="ignore_rule", workspace=self.workspace)
+            return
+
+        if subtype == "bot_message" and not self.processor.rules.bot_allowed(channel, bot_id):
+            logger.info("Skipping bot message from disallowed channel=%s", channel)
+            EVENTS_SKIPPED.inc(reason="bot_channel", workspace=self.workspace)
+            return
+
+        if subtype and subtype != "bot_message":
+            logger.info("Skipping message with unsupported subtype=%s", subtype)
+            EVENTS_SKIPPED.inc(reason="subtype", workspace=self.workspace)
+            return
+
+        if self.processed_messages.seen(make_dedup_key(channel, ts, event_id)):
+            logger.info("Message with ts=%s already processed, skipping", ts)
+            EVENTS_SKIPPED.inc(reason="dedup", workspace=self.workspace)
+            return
+
+        if not text:
+            logger.info("Message has no text, ignoring")
+            EVENTS_SKIPPED.inc(reason="no_text", workspace=self.workspace)
+            return
+
+        logger.info("Message in channel %s from user %s: %s", channel, user, text,
+                    extra={"fields": {"channel": channel, "user": user, "ts": ts, "event_id": event_id}})
+        if not decision.actions:
+            logger.debug("Cant handle the message")
+            EVENTS_SKIPPED.inc(reason="no_action", workspace=self.workspace)
+            return
+        self.submit_decision(event, decision.actions)
+        EVENTS_DISPATCHED.inc(kind="message", workspace=self.workspace)
+
+    @staticmethod
+    def action_priority(action: str, payload: dict) -> str:
+        """Dev calls and anything that places a call (VIP channels) are paging, the rest is routine."""
+        if action in ("dev_call", "call") or any(rule_action == CALL for _, rule_action in payload.get("actions", ())):
+            return PAGING
+        return ROUTINE
+
+    def submit_decision(self, event: dict, actions: list):
+        """Records the forward and the call of a routed message as separate outbox
+        entries, so a retry of one does not repeat the other."""
+        channel = event.get('channel', 'unknown')
+        ts = event.get('ts')
+        kinds = set()
+        for rule_name, action in actions:
+            logger.info("Rule %s matched in channel %s, action=%s", rule_name, channel, action)
+            kinds.add(action)
+        payload = {"event": event, "actions": [list(a) for a in actions]}
+        if FORWARD in kinds:
+            self.submit_action(channel, "forward", f"forward:{channel}:{ts}", payload)
+        if CALL in kinds:
+            self.submit_action(channel, "call", f"call:{channel}:{ts}", payload)
 
-            if ts in self.processed_messages:
-                logger.info(f"Message with ts={ts} already processed, skipping")
+    def submit_action(self, channel: str, action: str, key: str, payload: dict):
+        """Records the action in the outbox, then hands it to the dispatcher."""
+        if self.outbox:
+            entry = self.outbox.append(key, action, payload)
+            if entry is None:
                 return
+        else:
+            entry = OutboxEntry(None, key, action, payload)
+        self.dispatch_entry(channel, entry)
 
-            try:
-                message_ts = float(ts)
-                if message_ts < self.start_time:
-                    logger.info(f"Ignoring old message: ts={message_ts}, start_time={self.start_time}")
+    def dispatch_entry(self, channel: str, entry: OutboxEntry):
+        if entry.id:
+            with self.inflight_lock:
+                if entry.id in self.inflight:
                     return
-            except ValueError:
-                logger.error(f"Invalid timestamp: {ts}")
-                return
+                self.inflight.add(entry.id)
+        if not self.dispatcher.submit(channel, self.run_action, entry,
+                                      priority=self.action_priority(entry.action, entry.payload)):
+            self._release_entry(entry)
 
-            if not text:
-                logger.info("Message has no text, ignoring")
-                return
+    def _release_entry(self, entry: OutboxEntry):
+        if entry.id:
+            with self.inflight_lock:
+                self.inflight.discard(entry.id)
+
+    def run_action(self, entry: OutboxEntry):
+        try:
+            self._run_action(entry)
+        finally:
+            self._release_entry(entry)
 
-            logger.info(f"Message in channel {channel} from user {user}: {text}")
-            if self.processor.has_support_tag(text):
-                logger.info(f"Support tag {self.config.tag} found in message: {text}")
-                self.forward_message(event)
-            if self.processor.is_tagged(text, self.bot_user_id):
-                logger.info(f"Bot is tagged {self.config.tag} in message: {text}")
-                self.forward_message(event)
-            if self.processor.is_vip(channel):
-                logger.info(f"Message from VIP channel {channel}: {text}")
-                self.voip.quick_call()
+    def _run_action(self, entry: OutboxEntry):
+        if self.leases and not self.leases.claim(f"{self.workspace}:{entry.key}"):
+            EVENTS_SKIPPED.inc(reason="leased", workspace=self.workspace)
+            if self.outbox and entry.id:
+                self.outbox.complete(entry)
+            return
+        try:
+            if entry.action == "dev_call":
+                self.handle_dev_call(entry.payload["event"])
+            elif entry.action == "forward":
+                self.handle_forward(entry.payload["event"])
+            elif entry.action == "call":
+                self.handle_call(entry.payload["event"])
+            elif entry.action == "message":
+                # Written before forwards and calls had their own entries
+                self.submit_decision(entry.payload["event"], [tuple(a) for a in entry.payload["actions"]])
             else:
-                logger.debug("Cant handle the message")
+                logger.error("Unknown outbox action %s for %s", entry.action, entry.key)
+        except Exception:
+            if self.outbox and entry.id:
+                self.outbox.fail(entry)
+            raise
+        if self.outbox and entry.id:
+            self.outbox.complete(entry)
+
+    def replay_outbox(self):
+        """Re-drives pending outbox entries that are not already queued, then prunes finished ones.
+
+        Runs at startup and from log_status, so an entry that failed and went
+        back to pending is retried without waiting for a restart.
+        """
+        if not self.outbox:
+            return
+        with self.inflight_lock:
+            entries = [entry for entry in self.outbox.pending() if entry.id not in self.inflight]
+        if entries:
+            logger.info(f"Replaying {len(entries)} pending outbox entries")
+        for entry in entries:
+            self.dispatch_entry(entry.payload["event"].get('channel', 'unknown'), entry)
+        self.outbox.prune()
+
+    def handle_dev_call(self, event: dict):
+        with STAGE_LATENCY.time(stage="dev_call", workspace=self.workspace):
+            fingerprint = self.processor.alert_fingerprint(event)
+            if self.dev_calls.page(fingerprint, event.get('ts')) == FAILED:
+                raise RuntimeError(f"Dev call for {fingerprint} was not placed")
+
+    def handle_forward(self, event: dict):
+        with STAGE_LATENCY.time(stage="process", workspace=self.workspace):
+            if self.forward_message(event):
+                # A new digest pages once; a CALL rule for the same message shares the key
+                channel = event.get('channel', 'unknown')
+                self.submit_action(channel, "call", f"call:{channel}:{event.get('ts')}", {"event": event})
+
+    def handle_call(self, event: dict):
+        with STAGE_LATENCY.time(stage="process", workspace=self.workspace):
+            if not self.voice.call(AsteriskVOIP.name):
+                raise RuntimeError(f"No voice provider placed the call for {event.get('ts')}")
 
     def handle_slash_commands(self, client: SocketModeClient, req: SocketModeRequest):
         if req.type == "slash_commands":
+            received = time.perf_counter()
             client.send_socket_mode_response({"envelope_id": req.envelope_id})
-            logger.info(
-                f"Command received: {req.type} - {req.payload['command']}, payload: {req.payload if self.config.debug_mode else 'DEBUG_MODE = FALSE'}")
-            logger.info("Here slash_commands")
-            if req.payload["command"] in self.config.commands:
-                handler = CommandHandler(req.payload, self.web_client, self.config)
-                handler.forward_command()
-
-    def forward_message(self, event: dict):
-        logger.debug(f"Forwarding message: {event}")
-        permalink = self.processor.get_message_link(event, self.web_client)
+            ACK_LATENCY.observe(time.perf_counter() - received, type=req.type, workspace=self.workspace)
+            self.run_slash_command(req)
+
+    def run_slash_command(self, req: SocketModeRequest):
+        logger.info(
+            f"Command received: {req.type} - {req.payload['command']}, payload: {req.payload if self.config.debug_mode else 'DEBUG_MODE = FALSE'}")
+        logger.info("Here slash_commands")
+        if req.payload["command"] in self.config.commands:
+            self.command_handler.forward_command(req.payload)
+
+    def forward_message(self, event: dict) -> bool:
+        logger.debug("Forwarding message: %s", event)
+        with STAGE_LATENCY.time(stage="permalink", workspace=self.workspace):
+            permalink = self.processor.get_message_link(event, self.web_client)
         if permalink:
-            try:
-                self.web_client.chat_postMessage(
-                    channel=self.config.target_channel,
-                    link_names=True,
-                    mrkdwn=True,
-                    text=f"@fls_group - You got a <{permalink}|message>",
-                    unfurl_links=True
-                )
-                logger.info(f"Message forwarded to channel {self.config.target_channel}")
-                self.voip.quick_call()
-            except SlackApiError as e:
-                logger.error(f"Error forwarding message: {e.response['error']}")
-
-    def start(self):
+            with STAGE_LATENCY.time(stage="metadata", workspace=self.workspace):
+                source, author = self.processor.describe_forward(event)
+            return self.forwards.add(event.get('channel', 'unknown'), event.get('thread_ts'), permalink, author,
+                                     source)
+        return False
+
+    def post_forward(self, text: str):
+        try:
+            response = self.web_client.chat_postMessage(
+                channel=self.config.target_channel,
+                link_names=True,
+                mrkdwn=True,
+                text=text,
+                unfurl_links=True
+            )
+            logger.info("Message forwarded to channel %s", self.config.target_channel)
+            return response.get('ts')
+        except SlackApiError as e:
+            logger.error("Error forwarding message: %s", e.response['error'])
+            raise
+
+    def update_forward(self, ts: str, text: str):
+        try:
+            self.broadcaster.call("chat_update", channel=self.config.target_channel, ts=ts, text=text,
+                                  link_names=True)
+        except SlackApiError as e:
+            logger.error("Error updating forwarded digest: %s", e.response['error'])
+
+    def watched_channels(self) -> set:
+        """Channels the reconnect catch-up fetches history for: VIP channels and the target channel."""
+        channels = set(self.config.routing.vip_channel_set)
+        if self.config.target_channel:
+            channels.add(self.config.target_channel)
+        return channels
+
+    def is_watched(self, channel: str) -> bool:
+        return channel in self.config.routing.vip_channel_set or channel == self.config.target_channel
+
+    def on_socket_close(self, code: int, reason: str = None):
+        logger.info(f"Socket Mode connection closed: code={code}, reason={reason}")
+        SOCKET_CONNECTED.set(0, workspace=self.workspace)
+        SOCKET_RECONNECTS.inc(workspace=self.workspace)
+        self.catchup.disconnected()
+        self.catchup.request(self.socket_client.is_connected)
+
+    def on_sighup(self, signum, frame):
+        logger.info("SIGHUP received, reloading routing lists")
+        self.context.reload()
+
+    def log_status(self):
+        stats = self.dispatcher.stats()
+        dedup_stats = self.processed_messages.stats()
+        logger.info(
+            f"Bot is running... queue_depth={stats['queue_depth']}, "
+            f"processed={stats['processed']}, rejected={stats['rejected']}, "
+            f"avg_wait={stats['avg_wait']:.3f}s, max_wait={stats['max_wait']:.3f}s, "
+            f"paging_max_wait={stats['paging_max_wait']:.3f}s, slo_missed={stats['slo_missed']}, "
+            f"dedup_size={dedup_stats['size']}, dedup_hits={dedup_stats['hits']}, "
+            f"dedup_evictions={dedup_stats['evictions']}")
+        logger.info(f"Dev calls: {self.dev_calls.stats()}")
+        logger.info(f"Forwards: {self.forwards.stats()}")
+        logger.info(f"Metadata cache: {self.processor.metadata.stats()}")
+        logger.info(f"Voice: {self.voice.stats()}")
+        logger.info(f"Catch-up: {self.catchup.stats()}")
+        if self.leases:
+            logger.info(f"Leases: {self.leases.stats()}")
+        self.replay_outbox()
+
+    def start(self, standalone: bool = True):
+        """Runs the bot until stopped. WorkspaceRunner passes standalone=False
+        and owns the SIGHUP handler itself. The metrics server belongs to the
+        process (main() or WorkspaceRunner), so restarts don't rebind it."""
+        self.dispatcher.start()
+        self.voice.start()
+        self.replay_outbox()
+        if standalone and hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.on_sighup)
+        if self.config.socket_runtime == "asyncio":
+            self.start_async()
+        else:
+            self.start_threaded()
+
+    def start_async(self):
+        from async_runtime import AsyncSocketRuntime  # pulls in aiohttp, only needed for this runtime
+        self.async_runtime = AsyncSocketRuntime(
+            self,
+            connections=self.config.socket_connections,
+            base_delay=self.config.reconnect_base_delay,
+            max_delay=self.config.reconnect_max_delay
+        )
+        threading.Thread(target=self._status_loop, name="status", daemon=True).start()
+        logger.info(f"Starting async Socket Mode runtime with {self.config.socket_connections} connections...")
+        asyncio.run(self.async_runtime.run())
+
+    def _status_loop(self):
+        while not self.stopped.wait(60):
+            self.log_status()
+
+    def start_threaded(self):
         self.socket_client.socket_mode_request_listeners.append(self.handle_message)
         self.socket_client.socket_mode_request_listeners.append(self.handle_slash_commands)
+        attempt = 0
         while True:
             try:
                 logger.info("Starting SocketModeClient...")
                 self.socket_client.connect()
+                SOCKET_CONNECTED.set(1, workspace=self.workspace)
+                attempt = 0
                 logger.info("SocketModeClient connected")
                 while True:
                     time.sleep(60)
-                    logger.info("Bot is running...")
+                    self.log_status()
             except Exception as e:
                 logger.error(f"Error in SocketModeClient: {e}")
-                logger.info("Reconnecting in 30 seconds...")
-                time.sleep(30)
+                SOCKET_CONNECTED.set(0, workspace=self.workspace)
+                SOCKET_RECONNECTS.inc(workspace=self.workspace)
+                delay = jittered_backoff(attempt, self.config.reconnect_base_delay, self.config.reconnect_max_delay)
+                attempt += 1
+                logger.info(f"Reconnecting in {delay:.1f} seconds...")
+                time.sleep(delay)
+
+    def stop(self):
+        logger.info("Stopping SlackBot...")
+        self.close()
+        self.context.close()
+
+    def close(self):
+        """Stops this bot's threads, timers, sockets and databases but leaves the
+        shared AppContext open, so a new SlackBot can be built on it after a crash."""
+        self.stopped.set()
+        self.context.remove_reload_listener(self.processor.reload_rules)
+        self.catchup.close()
+        if self.async_runtime:
+            self.async_runtime.stop()
+        try:
+            self.socket_client.close()
+            # close() leaves the session runner thread that the SDK starts in the constructor running
+            self.socket_client.current_session_runner.shutdown()
+        except Exception as e:
+            logger.error(f"Error closing SocketModeClient: {e}")
+        self.dispatcher.shutdown()
+        self.dev_calls.close()
+        self.voice.close()
+        self.forwards.close()
+        if self.processor.metadata:
+            self.processor.metadata.close()
+        self.processed_messages.close()
+        if self.outbox:
+            self.outbox.close()
+        if self.leases:
+            self.leases.close()
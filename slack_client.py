@@ -0,0 +1,241 @@
+import http.client
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry import RateLimitErrorRetryHandler, ConnectionErrorRetryHandler
+from slack_sdk.http_retry.builtin_handlers import ServerErrorRetryHandler
+from slack_sdk.http_retry.builtin_interval_calculators import BackoffRetryIntervalCalculator
+
+from metrics import WEB_API_LATENCY, WEB_API_COALESCED
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a response, by Web API method. Anything else uses the client timeout.
+METHOD_TIMEOUTS = {
+    "auth.test": 5,
+    "chat.postMessage": 10,
+    "chat.update": 10,
+    "chat.getPermalink": 5,
+    "conversations.info": 5,
+    "users.info": 5,
+    "conversations.history": 15,
+    "conversations.list": 30,
+    "users.list": 30,
+}
+
+# Read-only methods: identical calls in flight at the same time share one request, and
+# server and connection errors are retried. Other methods (chat.postMessage, ...) are
+# only retried when the request never reached Slack, so a message is not posted twice.
+READ_ONLY_METHODS = frozenset({
+    "auth.test", "chat.getPermalink", "conversations.info", "users.info", "conversations.history",
+    "conversations.list", "users.list",
+})
+
+# Errors that mean a pooled keep-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def api_method(url: str) -> str:
+    return urlsplit(url).path.rsplit("/", 1)[-1]
+
+
+class ReadOnlyServerErrorRetryHandler(ServerErrorRetryHandler):
+    """Retries 500 and 503 responses of read-only methods only: a write that
+    failed with a server error may still have been applied."""
+
+    def _can_retry(self, *, state, request, response=None, error=None) -> bool:
+        return (api_method(request.url) in READ_ONLY_METHODS
+                and super()._can_retry(state=state, request=request, response=response, error=error))
+
+
+class ReadOnlyConnectionErrorRetryHandler(ConnectionErrorRetryHandler):
+    """Retries connection errors of read-only methods, and of any method when
+    the connection was refused, since then nothing was sent."""
+
+    def __init__(self, max_retry_count: int = 1, **kwargs):
+        kwargs.setdefault("error_types", [URLError, ConnectionResetError, http.client.RemoteDisconnected,
+                                          ConnectionRefusedError])
+        super().__init__(max_retry_count, **kwargs)
+
+    def _can_retry(self, *, state, request, response=None, error=None) -> bool:
+        if not super()._can_retry(state=state, request=request, response=response, error=error):
+            return False
+        return (api_method(request.url) in READ_ONLY_METHODS
+                or isinstance(getattr(error, "reason", error), ConnectionRefusedError))
+
+
+class ConnectionPool:
+    """Idle keep-alive HTTP connections per host, shared by all threads.
+
+    The SDK's urllib transport opens a new connection (TCP and TLS
+    handshake) for every call; this keeps up to `size` of them open per host.
+    """
+
+    def __init__(self, ssl_context=None, size: int = 8):
+        self.ssl_context = ssl_context
+        self.size = size
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.opened = 0
+        self.reused = 0
+
+    def acquire(self, scheme: str, netloc: str, timeout: float) -> tuple:
+        """Returns (connection, reused)."""
+        with self.lock:
+            connections = self.idle.get((scheme, netloc))
+            if connections:
+                self.reused += 1
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+            self.opened += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout, context=self.ssl_context), False
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    def release(self, scheme: str, netloc: str, connection):
+        with self.lock:
+            connections = self.idle.setdefault((scheme, netloc), [])
+            if len(connections) < self.size:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"opened": self.opened, "reused": self.reused,
+                    "idle": sum(len(connections) for connections in self.idle.values())}
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle = {}
+
+
+class InstrumentedWebClient(WebClient):
+    """WebClient that records the latency of every Web API call by method.
+
+    Requests go over pooled keep-alive connections with a timeout per
+    method (METHOD_TIMEOUTS, overridable with `method_timeouts`). Identical
+    read-only calls that are already in flight are coalesced: the later
+    callers wait for the first request and get the same response. Retries
+    on ratelimited, server and connection errors are done by the retry
+    handlers passed in `retry_handlers`. A stale pooled connection is
+    retried on a new one unless a write was already sent on it. A proxy
+    falls back to the SDK's urllib transport.
+    """
+
+    def __init__(self, *args, pool_size: int = 8, method_timeouts: dict = None, workspace: str = "default",
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workspace = workspace
+        self.method_timeouts = dict(METHOD_TIMEOUTS, **(method_timeouts or {}))
+        self.pool = ConnectionPool(self.ssl, pool_size)
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+
+    def api_call(self, api_method: str, **kwargs):
+        if api_method not in READ_ONLY_METHODS or kwargs.get("files"):
+            return self._timed_call(api_method, **kwargs)
+        key = (api_method, json.dumps(kwargs, sort_keys=True, default=str))
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        if not leader:
+            WEB_API_COALESCED.inc(method=api_method, workspace=self.workspace)
+            return future.result()
+        try:
+            response = self._timed_call(api_method, **kwargs)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.inflight_lock:
+                del self.inflight[key]
+
+    def _timed_call(self, api_method: str, **kwargs):
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return super().api_call(api_method, **kwargs)
+        except SlackApiError as e:
+            outcome = e.response.get('error') or "error"
+            raise
+        except Exception:
+            outcome = "exception"
+            raise
+        finally:
+            WEB_API_LATENCY.observe(time.perf_counter() - started, method=api_method, outcome=outcome,
+                                    workspace=self.workspace)
+
+    def _perform_urllib_http_request_internal(self, url: str, req) -> dict:
+        parts = urlsplit(url)
+        if self.proxy is not None or parts.scheme not in ("http", "https"):
+            return super()._perform_urllib_http_request_internal(url, req)
+        method = api_method(url)
+        timeout = self.method_timeouts.get(method, self.timeout)
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        while True:
+            connection, reused = self.pool.acquire(parts.scheme, parts.netloc, timeout)
+            sent = False
+            try:
+                connection.request(req.get_method(), path, body=req.data, headers=dict(req.header_items()))
+                sent = True
+                response = connection.getresponse()
+                body = response.read()
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                # Once sent, a write may have been applied before the connection dropped
+                if reused and (not sent or method in READ_ONLY_METHODS):
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(parts.scheme, parts.netloc, connection)
+            break
+        if not 200 <= response.status < 300:
+            raise HTTPError(url, response.status, response.reason, response.msg, io.BytesIO(body))
+        if response.msg.get_content_type() == "application/gzip":
+            return {"status": response.status, "headers": response.msg, "body": body}
+        charset = response.msg.get_content_charset() or "utf-8"
+        return {"status": response.status, "headers": response.msg, "body": body.decode(charset)}
+
+    def close(self):
+        self.pool.close()
+
+
+def create_web_client(config) -> InstrumentedWebClient:
+    retry_handlers = [
+        RateLimitErrorRetryHandler(max_retry_count=config.slack_ratelimit_retries),
+        ReadOnlyServerErrorRetryHandler(max_retry_count=config.slack_server_error_retries,
+                                        interval_calculator=BackoffRetryIntervalCalculator(backoff_factor=0.5)),
+        ReadOnlyConnectionErrorRetryHandler(max_retry_count=config.slack_server_error_retries),
+    ]
+    return InstrumentedWebClient(
+        token=config.bot_token,
+        base_url=config.slack_api_url,
+        timeout=config.slack_timeout,
+        retry_handlers=retry_handlers,
+        pool_size=config.slack_pool_size,
+        method_timeouts=config.slack_method_timeouts,
+        workspace=config.workspace or "default"
+    )
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from benchmarks.fake_servers import FakeServer
+from escalation import EscalationEngine
+
+
+def ari_app(delays: dict) -> web.Application:
+    """ARI channels endpoint that answers each endpoint after delays[endpoint] seconds (default 0.2)."""
+    app = web.Application()
+    app["started"] = []
+
+    async def channels(request):
+        endpoint = request.query["endpoint"]
+        app["started"].append((endpoint, time.monotonic()))
+        await asyncio.sleep(delays.get(endpoint, 0.2))
+        return web.json_response({"id": f"channel-{endpoint}"})
+
+    app.router.add_post("/ari/channels", channels)
+    return app
+
+
+def calls(server: FakeServer, targets: list) -> list:
+    return [{"target": target, "url": f"{server.url}/ari/channels", "params": {"endpoint": target}}
+            for target in targets]
+
+
+@pytest.fixture
+def engine():
+    engine = EscalationEngine()
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(app: web.Application) -> FakeServer:
+        servers.append(FakeServer(app).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_dial_calls_all_targets_concurrently(engine, serve):
+    app = ari_app({})
+    server = serve(app)
+    targets = [f"SIP/target{i}" for i in range(4)]
+
+    started = time.monotonic()
+    results = engine.dial("asterisk", ("user", "password"), calls(server, targets), timeout=5)
+    elapsed = time.monotonic() - started
+
+    assert [result["target"] for result in results] == targets
+    assert all(result["ok"] and result["status"] == 200 for result in results)
+    assert results[0]["body"] == {"id": "channel-SIP/target0"}
+    # Four 0.2s answers in parallel, not 0.8s one after another
+    assert elapsed < 0.6
+    first, last = min(t for _, t in app["started"]), max(t for _, t in app["started"])
+    assert last - first < 0.15
+
+
+def test_slow_target_times_out_alone(engine, serve):
+    server = serve(ari_app({"SIP/slow": 2}))
+
+    started = time.monotonic()
+    results = engine.dial("asterisk", ("user", "password"), calls(server, ["SIP/fast", "SIP/slow"]), timeout=0.5)
+    elapsed = time.monotonic() - started
+
+    fast, slow = results
+    assert fast["ok"] and fast["latency"] < 0.5
+    assert not slow["ok"]
+    assert slow["status"] is None
+    assert slow["body"] == "Timed out after 0.5s"
+    assert elapsed < 2
+
+
+def test_timed_out_request_is_cancelled(engine, serve):
+    server = serve(ari_app({"SIP/slow": 2}))
+    engine.dial("asterisk", ("user", "password"), calls(server, ["SIP/slow"]), timeout=0.3)
+
+    async def running_tasks() -> int:
+        return len(asyncio.all_tasks() - {asyncio.current_task()})
+
+    assert asyncio.run_coroutine_threadsafe(running_tasks(), engine.loop).result(5) == 0
+
+
+def test_close_aborts_a_dial_in_flight(serve):
+    server = serve(ari_app({"SIP/slow": 2}))
+    engine = EscalationEngine()
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(
+        engine.dial("asterisk", ("user", "password"), calls(server, ["SIP/slow"]), timeout=5)))
+    thread.start()
+    time.sleep(0.3)
+
+    engine.close()
+    # The server would answer after 2s; close() must not wait for it
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert len(results) == 1 and not results[0]["ok"]
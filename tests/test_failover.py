@@ -0,0 +1,145 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fake_servers import FakeServer, fake_voip_app
+from escalation import EscalationEngine
+from failover import CLOSED, OPEN, VoiceRouter
+from voip import AsteriskVOIP
+from voip_twilio import TwilioVOIP
+
+
+@pytest.fixture
+def voip():
+    app = fake_voip_app(latency=0.01)
+    server = FakeServer(app).start()
+    yield app, server
+    server.stop()
+
+
+@pytest.fixture
+def router(voip):
+    _, server = voip
+    config = SimpleNamespace(
+        server_ip="127.0.0.1", ari_username="user", ari_password="password",
+        target_sip_1="SIP/dev1", target_sip_2=None, ari_url=f"{server.url}/ari", asterisk_call_timeout=0.5,
+        twilio_account_sid="ACfake", twilio_account_token="fake", twilio_number="+10000000000",
+        twilio_api_url=server.url, twilio_sip_list=("sip:dev1@example.com",), twilio_call_timeout=0.5,
+        voip_probe_timeout=0.5,
+    )
+    engine = EscalationEngine()
+    router = VoiceRouter([AsteriskVOIP(config, engine), TwilioVOIP(config, engine)],
+                         failure_threshold=2, reset_timeout=0.5, probe_interval=0)
+    yield router
+    router.close()
+    engine.close()
+
+
+def providers(app) -> list:
+    return [provider for provider, _ in app["calls"]]
+
+
+def test_healthy_page_uses_preferred_provider(voip, router):
+    app, _ = voip
+
+    assert router.call(TwilioVOIP.name)
+    assert router.call(AsteriskVOIP.name)
+
+    assert providers(app) == ["twilio", "asterisk"]
+    assert router.stats()["failovers"] == 0
+
+
+def test_failing_provider_fails_over_and_opens_circuit(voip, router):
+    app, _ = voip
+    app["faults"]["asterisk"] = {"status": 500}
+
+    assert router.call(AsteriskVOIP.name)
+    assert router.breakers["asterisk"].state == CLOSED
+    assert router.call(AsteriskVOIP.name)
+
+    assert providers(app) == ["twilio", "twilio"]
+    assert router.breakers["asterisk"].state == OPEN
+    assert router.stats()["failovers"] == 2
+
+
+def test_open_circuit_skips_hanging_provider(voip, router):
+    app, _ = voip
+    app["faults"]["asterisk"] = {"delay": 2}
+    for _ in range(2):
+        assert router.call(AsteriskVOIP.name)
+    assert router.breakers["asterisk"].state == OPEN
+
+    started = time.monotonic()
+    assert router.call(AsteriskVOIP.name)
+    elapsed = time.monotonic() - started
+
+    # Asterisk is not tried at all, so the page does not wait out its 0.5s timeout
+    assert elapsed < 0.3
+    assert providers(app) == ["twilio"] * 3
+
+
+def test_half_open_trial_closes_circuit_after_recovery(voip, router):
+    app, _ = voip
+    app["faults"]["asterisk"] = {"status": 500}
+    for _ in range(2):
+        router.call(AsteriskVOIP.name)
+    app["faults"].clear()
+
+    # Still open before reset_timeout: the page goes straight to twilio
+    assert router.call(AsteriskVOIP.name)
+    assert providers(app)[-1] == "twilio"
+
+    time.sleep(0.6)
+    assert router.call(AsteriskVOIP.name)
+
+    assert providers(app)[-1] == "asterisk"
+    assert router.breakers["asterisk"].state == CLOSED
+
+
+def test_failed_half_open_trial_reopens_circuit(voip, router):
+    app, _ = voip
+    app["faults"]["asterisk"] = {"status": 500}
+    for _ in range(2):
+        router.call(AsteriskVOIP.name)
+
+    opened_at = router.breakers["asterisk"].opened_at
+
+    time.sleep(0.6)
+    # The trial call hits the still failing asterisk, fails over and re-opens the circuit
+    assert router.call(AsteriskVOIP.name)
+    assert router.breakers["asterisk"].state == OPEN
+    assert router.breakers["asterisk"].opened_at > opened_at
+
+    assert router.call(AsteriskVOIP.name)
+    assert providers(app) == ["twilio"] * 4
+
+
+def test_probes_open_and_close_circuits(voip, router):
+    app, _ = voip
+    app["faults"]["twilio"] = {"status": 503}
+    router.probe_all()
+    router.probe_all()
+    assert router.breakers["twilio"].state == OPEN
+    assert router.breakers["asterisk"].state == CLOSED
+
+    app["faults"].clear()
+    router.probe_all()
+
+    assert router.breakers["twilio"].state == CLOSED
+    assert app["probes"].count("twilio") == 3
+
+
+def test_all_circuits_open_fails_fast(voip, router):
+    app, _ = voip
+    app["faults"]["asterisk"] = {"status": 500}
+    app["faults"]["twilio"] = {"status": 500}
+    for _ in range(2):
+        assert not router.call(AsteriskVOIP.name)
+
+    assert not router.call(AsteriskVOIP.name)
+
+    stats = router.stats()
+    assert stats["asterisk_circuit"] == OPEN and stats["twilio_circuit"] == OPEN
+    assert stats["failed"] == 3
+    assert app["calls"] == []
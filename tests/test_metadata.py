@@ -0,0 +1,94 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from message_processor import MessageProcessor
+from metadata import MetadataCache
+
+
+class BlockingApi:
+    """Fake Broadcaster.call that records which thread called it and blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.released = threading.Event()
+        self.fail = False
+
+    def __call__(self, method: str, **kwargs):
+        self.calls.append((method, kwargs, threading.current_thread()))
+        self.released.wait(5)
+        if self.fail:
+            raise ConnectionError("connection reset")
+        if method == "conversations_info":
+            return {"channel": {"id": kwargs["channel"], "name": "support"}}
+        return {"user": {"id": kwargs["user"], "profile": {"display_name": "Jane"}}}
+
+
+@pytest.fixture
+def api():
+    api = BlockingApi()
+    yield api
+    api.released.set()
+
+
+@pytest.fixture
+def cache(api):
+    cache = MetadataCache(api)
+    yield cache
+    cache.close()
+
+
+def test_miss_does_not_call_the_web_api_inline(api, cache):
+    # The API blocks until released, so an inline call would hang here
+    assert cache.channel_name("C1") is None
+    assert cache.user_name("U1") is None
+    assert all(thread is not threading.current_thread() for _, _, thread in api.calls)
+
+    api.released.set()
+    cache.wait_fetched()
+
+    assert cache.channel_name("C1") == "support"
+    assert cache.user_name("U1") == "Jane"
+    assert [method for method, _, _ in api.calls] == ["conversations_info", "users_info"]
+
+
+def test_repeated_misses_queue_one_lookup(api, cache):
+    for _ in range(5):
+        assert cache.channel_name("C1") is None
+    api.released.set()
+    cache.wait_fetched()
+
+    assert len(api.calls) == 1
+    assert cache.stats()["api_calls"] == 1
+
+
+def test_failed_lookup_is_queued_again(api, cache):
+    api.fail = True
+    api.released.set()
+    cache.channel_name("C1")
+    cache.wait_fetched()
+    assert cache.channel_name("C1") is None
+    cache.wait_fetched()
+
+    api.fail = False
+    cache.channel_name("C1")
+    cache.wait_fetched()
+
+    assert len(api.calls) == 3
+    assert cache.channel_name("C1") == "support"
+
+
+def test_describe_forward_falls_back_to_mention_on_miss(api, cache):
+    config = SimpleNamespace(permalink_cache_size=10, routing=SimpleNamespace(vip_channel_set={"C1"}))
+    processor = MessageProcessor(config)
+    processor.metadata = cache
+    event = {"channel": "C1", "user": "U1"}
+
+    assert processor.describe_forward(event) == ("in <#C1> (VIP)", None)
+    assert all(thread is not threading.current_thread() for _, _, thread in api.calls)
+
+    api.released.set()
+    cache.wait_fetched()
+
+    assert processor.describe_forward(event) == ("in #support (VIP)", "Jane")
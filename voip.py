@@ -1,37 +1,56 @@
 import logging
-from config import SlackBotConfig
-import requests
-import os
+from escalation import EscalationEngine
 
 logger = logging.getLogger(__name__)
 
 
 class AsteriskVOIP:
+    name = "asterisk"
 
-    def __init__(self):
-        self.config = SlackBotConfig()
+    def __init__(self, config, engine: EscalationEngine = None):
+        self.config = config
         self.server_ip = self.config.server_ip
         self.username = self.config.ari_username
         self.password = self.config.ari_password
         self.target_1 = self.config.target_sip_1
         self.target_2 = self.config.target_sip_2
+        self.ari_url = self.config.ari_url or f"http://{self.server_ip}:8088/ari"
+        self.engine = engine or EscalationEngine()
+
+    def auth(self) -> tuple:
+        return self.username or "", self.password or ""
+
+    def call(self) -> bool:
+        return self.quick_call()
+
+    def probe(self) -> bool:
+        return self.engine.probe("asterisk", self.auth(), f"{self.ari_url}/asterisk/info",
+                                 self.config.voip_probe_timeout)
 
     def quick_call(self) -> bool:
         try:
-            target_list = [self.target_1, self.target_2]
-            for target in target_list:
-                r = requests.post(
-                    f"http://{self.server_ip}:8088/ari/channels",
-                    params={"endpoint": f"{target}", "app": "quick-call"},
-                    auth=(self.username, self.password),
-                    timeout=60
-                )
-                if r.status_code == 200:
-                    channel_id = r.json()['id']
-                    logger.info(f"Successfully called - {channel_id}")
+            target_list = [target for target in [self.target_1, self.target_2] if target]
+            calls = [
+                {
+                    "target": target,
+                    "url": f"{self.ari_url}/channels",
+                    "params": {"endpoint": f"{target}", "app": "quick-call"},
+                }
+                for target in target_list
+            ]
+            results = self.engine.dial(
+                "asterisk",
+                self.auth(),
+                calls,
+                timeout=self.config.asterisk_call_timeout
+            )
+            for result in results:
+                if result["ok"]:
+                    channel_id = result["body"]['id']
+                    logger.info(f"Successfully called - {channel_id} ({result['target']}, {result['latency']:.3f}s)")
                 else:
-                    logger.error(f"Error: {r.status_code}")
+                    logger.error(f"Error calling {result['target']}: {result['status']} - {result['body']}")
+            return any(result["ok"] for result in results)
         except Exception as e:
             logger.error(f"Error: {e}")
         return False
-
@@ -1,46 +1,61 @@
 import logging
-from requests.auth import HTTPBasicAuth
-import requests
+from escalation import EscalationEngine
 
 logger = logging.getLogger(__name__)
 
 
 class TwilioVOIP:
+    name = "twilio"
 
-    def __init__(self, config):
+    def __init__(self, config, engine: EscalationEngine = None):
         self.config = config
+        self.engine = engine or EscalationEngine()
 
-    def call_twilio(self):
+    def auth(self) -> tuple:
+        return self.config.twilio_account_sid or "", self.config.twilio_account_token or ""
+
+    def call(self) -> bool:
+        return self.call_twilio()
+
+    def probe(self) -> bool:
+        url = f"{self.config.twilio_api_url}/2010-04-01/Accounts/{self.config.twilio_account_sid}.json"
+        return self.engine.probe("twilio", self.auth(), url, self.config.voip_probe_timeout)
+
+    def call_twilio(self) -> bool:
         try:
+            twilio_sid = self.config.twilio_account_sid
+            twilio_number = self.config.twilio_number
+            url = f"{self.config.twilio_api_url}/2010-04-01/Accounts/{twilio_sid}/Calls.json"
+            calls = []
             for sip in self.config.twilio_sip_list:
-                twilio_sid = self.config.twilio_account_sid
-                twilio_token = self.config.twilio_account_token
-                twilio_number = self.config.twilio_number
-                twilio_sip = sip
                 logger.info(f"Calling - {sip}")
-                url = f"https://api.twilio.com/2010-04-01/Accounts/{twilio_sid}/Calls.json"
-
-                data = {
-                    "From": twilio_number,
-                    "To": twilio_sip,
-                    "Url": "http://demo.twilio.com/docs/voice.xml",
-                    "Timeout": "60"
-                }
-
-                response = requests.post(
-                    url,
-                    auth=HTTPBasicAuth(twilio_sid, twilio_token),
-                    data=data,
-                    timeout=10
-                )
-
-                if response.status_code == 201:
-                    call_sid = response.json().get('sid')
-                    logger.info(f"Call started. SID: {call_sid}, {sip}")
-                    logger.info(f"Response: {response.json()}")
+                calls.append({
+                    "target": sip,
+                    "url": url,
+                    "data": {
+                        "From": twilio_number,
+                        "To": sip,
+                        "Url": "http://demo.twilio.com/docs/voice.xml",
+                        "Timeout": "60"
+                    },
+                })
+
+            results = self.engine.dial(
+                "twilio",
+                self.auth(),
+                calls,
+                timeout=self.config.twilio_call_timeout,
+                ok_status=201
+            )
+            for result in results:
+                if result["ok"]:
+                    call_sid = result["body"].get('sid')
+                    logger.info(f"Call started. SID: {call_sid}, {result['target']}, {result['latency']:.3f}s")
+                    logger.info(f"Response: {result['body']}")
                 else:
-                    logger.error(f"Twilio error: {response.status_code} - {response.text}")
+                    logger.error(f"Twilio error: {result['status']} - {result['body']}")
+            return any(result["ok"] for result in results)
 
         except Exception as e:
             logger.error(f"Error in twilio calling - {e}")
-
+        return False
@@ -0,0 +1,82 @@
+import logging
+import signal
+import threading
+import time
+
+from config import SlackBotConfig
+from backoff import jittered_backoff
+from context import AppContext
+from metrics import start_metrics_server, stop_metrics_server
+from slack_bot import SlackBot
+
+logger = logging.getLogger(__name__)
+
+
+class WorkspaceRunner:
+    """Runs one SlackBot per workspace in this process.
+
+    Every workspace gets its own AppContext, so Slack clients, HTTP sessions,
+    rate limit buckets, dispatcher, dedup and outbox are isolated. The
+    process owns the metrics server and the SIGHUP handler, which reloads
+    the routing lists of every workspace.
+    """
+
+    def __init__(self, workspaces: dict):
+        self.contexts = {
+            name: AppContext(SlackBotConfig(workspace=name, overrides=overrides))
+            for name, overrides in workspaces.items()
+        }
+        self.bots = {}
+        self.threads = []
+        self.metrics_server = None
+        self.stopped = threading.Event()
+
+    def _run(self, name: str):
+        config = self.contexts[name].config
+        attempt = 0
+        while not self.stopped.is_set():
+            started = time.monotonic()
+            bot = None
+            try:
+                logger.info(f"Starting workspace {name}")
+                bot = self.bots[name] = SlackBot(self.contexts[name])
+                bot.start(standalone=False)
+            except Exception as e:
+                if self.stopped.is_set():
+                    return
+                logger.error(f"Critical error in workspace {name}: {e}", exc_info=True)
+                if bot:
+                    bot.close()
+                if time.monotonic() - started > config.restart_max_delay:
+                    attempt = 0
+                delay = jittered_backoff(attempt, config.restart_base_delay, config.restart_max_delay)
+                attempt += 1
+                logger.info(f"Restarting workspace {name} in {delay:.1f} seconds...")
+                self.stopped.wait(delay)
+
+    def on_sighup(self, signum, frame):
+        logger.info("SIGHUP received, reloading routing lists of all workspaces")
+        for context in self.contexts.values():
+            context.reload()
+
+    def start(self):
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.on_sighup)
+        metrics_port = next(iter(self.contexts.values())).config.metrics_port
+        if metrics_port:
+            self.metrics_server = start_metrics_server(metrics_port)
+        for name in self.contexts:
+            thread = threading.Thread(target=self._run, args=(name,), name=f"workspace-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Running {len(self.contexts)} workspaces: {', '.join(self.contexts)}")
+        while not self.stopped.is_set():
+            time.sleep(1)
+
+    def stop(self):
+        self.stopped.set()
+        for name, bot in self.bots.items():
+            logger.info(f"Stopping workspace {name}")
+            bot.stop()
+        if self.metrics_server:
+            stop_metrics_server(self.metrics_server)